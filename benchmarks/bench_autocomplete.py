@@ -0,0 +1,62 @@
+"""
+Autocomplete lookup cost over a large static choice set
+
+Compares filtering a list of 50,000 choices on every request, the way an autocomplete
+handler without an index would, against ChoiceIndex.search and against answering from
+AutocompleteCache, both for an exact repeat and for a longer prefix filtered from a
+cached shorter one.
+
+    python benchmarks/bench_autocomplete.py
+"""
+import pathlib
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1] / "src"))
+
+from disunity.autocomplete import AutocompleteCache, ChoiceIndex  # noqa: E402
+
+NUMBER = 200
+REPEAT = 5
+
+NAMES = [f"{word}{i:05d}" for word in ("alpha", "bravo") for i in range(25_000)]
+CHOICES = [{"name": name, "value": name} for name in NAMES]
+INDEX = ChoiceIndex(CHOICES)
+
+
+def scan(text: str) -> list[dict]:
+    text = text.casefold()
+    return [c for c in CHOICES if c["name"].casefold().startswith(text)][:25]
+
+
+def cached(cache: AutocompleteCache, text: str) -> list[dict]:
+    choices = cache.get("find", "name", text)
+    if choices is None:
+        choices = scan(text)
+        cache.put("find", "name", text, choices, 60.0)
+    return choices
+
+
+def main():
+    warm = AutocompleteCache()
+    cached(warm, "bravo1234")
+
+    def derived():
+        # "bravo1234" has 11 matches, so "bravo12345" is filtered from it
+        cache = AutocompleteCache()
+        cache.put("find", "name", "bravo1234", INDEX.search("bravo1234"), 60.0)
+        return cached(cache, "bravo12345")
+
+    print(f"{'case':<24}{'us':>10}")
+    for label, func in (
+        ("linear scan", lambda: scan("bravo1234")),
+        ("ChoiceIndex.search", lambda: INDEX.search("bravo1234")),
+        ("cache, exact hit", lambda: cached(warm, "bravo1234")),
+        ("cache, longer prefix", derived),
+    ):
+        elapsed = min(timeit.repeat(func, number=NUMBER, repeat=REPEAT))
+        print(f"{label:<24}{elapsed / NUMBER * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Import cost of disunity
+
+Imports each target in a fresh interpreter under `-X importtime` and reports the time
+the import statement took, the median of several runs, along with which heavy third
+party packages were pulled in. Builders such as Embed and ActionRow import without the
+web stack, only the server loads quart and nacl, and aiohttp is loaded on the first
+outbound request.
+
+    python benchmarks/bench_import.py
+"""
+import pathlib
+import statistics
+import subprocess
+import sys
+
+SRC = str(pathlib.Path(__file__).parents[1] / "src")
+REPEAT = 7
+HEAVY = ("quart", "aiohttp", "nacl", "requests", "mimetypes")
+
+TARGETS = (
+    ("disunity", "import disunity"),
+    ("disunity.embed", "from disunity.embed import Embed"),
+    ("disunity.models.components", "from disunity.models.components import ActionRow"),
+    ("disunity.server", "from disunity import DisunityServer"),
+)
+
+
+def measure(statement: str) -> tuple[float, list[str]]:
+    """Import time of `statement` in ms, and the heavy packages it loaded."""
+    code = (
+        f"import sys; sys.path.insert(0, {SRC!r}); {statement}; "
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # top level entries are the imports made by the statement, plus interpreter
+    # startup which `baseline` subtracts
+    total = 0
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            if not fields[2].startswith("  "):
+                total += int(fields[1])
+    return total / 1000, [name for name in result.stdout.strip().split(",") if name]
+
+
+def median(statement: str) -> tuple[float, list[str]]:
+    runs = [measure(statement) for _ in range(REPEAT)]
+    return statistics.median(run[0] for run in runs), runs[0][1]
+
+
+def main():
+    baseline, _ = median("pass")
+    print(f"{'target':<30}{'ms':>10}  loaded")
+    for name, statement in TARGETS:
+        elapsed, loaded = median(statement)
+        print(f"{name:<30}{elapsed - baseline:>10.1f}  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
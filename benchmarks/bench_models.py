@@ -0,0 +1,158 @@
+"""
+Interaction model construction cost
+
+Compares the lazy, slotted Context against the previous eager models, which built
+User and Member objects and copied every field on construction. Reports the time and
+the number of allocated memory blocks per interaction, both for construction alone
+and for a handler that reads the command name and its options.
+
+    python benchmarks/bench_models.py
+"""
+import pathlib
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1] / "src"))
+
+from disunity.models import Context  # noqa: E402
+
+NUMBER = 100_000
+REPEAT = 5
+
+USER = {
+    "id": "80351110224678912",
+    "username": "Nelly",
+    "global_name": "Nelly",
+    "discriminator": "1337",
+    "avatar": "8342729096ea3675442027381ff50dfe",
+    "public_flags": 131141,
+}
+RECEIVED = {
+    "id": "1044028103983734814",
+    "application_id": "775799577604522054",
+    "type": 2,
+    "data": {
+        "id": "866818195033292850",
+        "name": "ping",
+        "type": 1,
+        "options": [{"name": "target", "type": 3, "value": "everyone"}],
+        "injected": [{"name": "target", "type": 3, "value": "everyone"}],
+    },
+    "guild_id": "290926798626357999",
+    "channel_id": "645027906669510667",
+    "member": {
+        "user": USER,
+        "roles": ["290926798626357999", "645027906669510668"],
+        "premium_since": None,
+        "permissions": "2147483647",
+        "pending": False,
+        "nick": None,
+        "mute": False,
+        "joined_at": "2017-03-13T19:19:14.040000+00:00",
+        "flags": 0,
+        "deaf": False,
+        "avatar": None,
+    },
+    "locale": "en-US",
+    "app_permissions": "442368",
+    "token": "A_UNIQUE_TOKEN",
+    "version": 1,
+}
+
+
+class EagerUser:
+    def __init__(self, received):
+        self.raw = received
+        self.id = int(received["id"])
+        self.name = received["username"]
+        self.global_name = received["global_name"]
+        self.discriminator = int(received["discriminator"])
+        self.avatar_decoration = received.get("avatar_decoration", "")
+        self.public_flags = int(received.get("public_flags", 0))
+
+
+class EagerMember:
+    def __init__(self, received):
+        self.raw = received
+        self.deaf = received["deaf"]
+        self.pending = received.get("pending", False)
+        self.joined_at = received["joined_at"]
+        self.mute = received["mute"]
+        self.nick = received["nick"]
+        self.permissions = int(received.get("permissions", 0))
+        self.roles = [int(role) for role in received["roles"]]
+        self.user = EagerUser(received["user"])
+        self.flags = int(received["flags"])
+
+
+class EagerContext:
+    def __init__(self, app, received):
+        self.raw = received
+        self.app_permissions = int(received.get("app_permissions", 0))
+        self.channel_id = int(received["channel_id"])
+        self.id = int(received["id"])
+        self.locale = received["locale"]
+        self.token = received["token"]
+        self.interaction_type = int(received["type"])
+        self.data = received["data"]
+        self.resolved = self.data.get("resolved", None)
+        self.component_type = self.data.get("component_type", None)
+        self.custom_id = self.data.get("custom_id", None)
+        self.values = self.data.get("values", [])
+        self.member = None
+        self.used_by = None
+        self.command_name = self.data.get("name", None)
+        self.modal_values = None
+        if "member" in received:
+            self.invoked_by = EagerUser(received["member"]["user"])
+            self.member = EagerMember(received["member"])
+        else:
+            self.invoked_by = EagerUser(received["user"])
+        self._app = app
+        self.acked = False
+        self.options = {}
+        for option in received["data"].get("injected", []):
+            self.options[option["name"]] = option["value"]
+
+
+def construct(cls):
+    return cls(None, RECEIVED)
+
+
+def handle(cls):
+    ctx = cls(None, RECEIVED)
+    ctx.command_name, ctx.options["target"]
+    return ctx
+
+
+def blocks(func, cls) -> float:
+    """Memory blocks still held by each interaction object after `func` ran."""
+    func(cls)  # warm up caches so only per interaction allocations are counted
+    tracemalloc.start()
+    kept = []
+    before = tracemalloc.take_snapshot()
+    for _ in range(1000):
+        kept.append(func(cls))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return sum(stat.count_diff for stat in stats) / 1000
+
+
+def main():
+    print(f"{'case':<28}{'ns':>10}{'blocks':>10}")
+    for label, func in (("construct", construct), ("construct + read", handle)):
+        for cls in (EagerContext, Context):
+            elapsed = min(
+                timeit.repeat(lambda: func(cls), number=NUMBER, repeat=REPEAT)
+            )
+            name = "eager" if cls is EagerContext else "lazy"
+            print(
+                f"{label + ' (' + name + ')':<28}"
+                f"{elapsed / NUMBER * 1e9:>10.0f}{blocks(func, cls):>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
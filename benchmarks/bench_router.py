@@ -0,0 +1,170 @@
+"""
+Dispatch cost per interaction type
+
+Compares resolving a handler through the compiled Router against the previous
+ApplicationCache lookup with string keys and structural pattern matching.
+
+    python benchmarks/bench_router.py
+"""
+import pathlib
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1] / "src"))
+
+from disunity import Package, SubOption  # noqa: E402
+from disunity.cache import ApplicationCache  # noqa: E402
+from disunity.router import Router  # noqa: E402
+
+NUMBER = 200_000
+REPEAT = 5
+
+
+class Bench(Package):
+    @Package.command("ping")
+    async def ping(self, ctx):
+        pass
+
+    @Package.sub("config", ["get", SubOption("set")])
+    async def config(self, ctx):
+        pass
+
+    @Package.sub("config", ["add", "remove"], group="roles")
+    async def config_roles(self, ctx):
+        pass
+
+    @Package.component("button")
+    async def button(self, ctx):
+        pass
+
+    @Package.component("page", args=(int, int))
+    async def page(self, ctx, owner_id, page):
+        pass
+
+    @Package.autocomplete("ping")
+    async def ping_autocomplete(self, ctx):
+        pass
+
+
+def legacy_command(cache: ApplicationCache, received: dict):
+    command = cache.commands[str(received["type"])].get(received["data"]["name"], None)
+    match received["data"]:
+        case {"options": [{"name": name, "options": options, "type": 2}]}:
+            coroutine = command.map[str(name)].get(options[0]["name"], None)
+            received["data"]["injected"] = options[0]["options"]
+        case {"options": [{"name": name, "options": options, "type": 1}]}:
+            coroutine = command.map["sub_commands"].get(name, None)
+            received["data"]["injected"] = options
+        case {"options": options}:
+            coroutine = command
+            received["data"]["injected"] = options
+        case _:
+            coroutine = command
+            received["data"]["injected"] = []
+    return coroutine
+
+
+def legacy_component(cache: ApplicationCache, received: dict):
+    # Encoded custom ids did not exist, route the same id as name-suffix
+    custom_id = str(received["data"]["custom_id"]).replace(":", "-")
+    return cache.components.get(custom_id.split("-")[0], None)
+
+
+def legacy_autocomplete(cache: ApplicationCache, received: dict):
+    return cache.autocompletes.get(str(received["data"]["name"]), None)
+
+
+def router_command(router: Router, received: dict):
+    coroutine, received["data"]["injected"] = router.resolve_command(
+        received["type"], received["data"]
+    )
+    return coroutine
+
+
+def router_component(router: Router, received: dict):
+    return router.resolve_component(received["data"]["custom_id"])
+
+
+def router_autocomplete(router: Router, received: dict):
+    return router.resolve_autocomplete(received["data"]["name"])
+
+
+CASES = {
+    "command": (
+        legacy_command,
+        router_command,
+        {"type": 2, "data": {"name": "ping", "options": [{"name": "a", "type": 3}]}},
+    ),
+    "sub command": (
+        legacy_command,
+        router_command,
+        {
+            "type": 2,
+            "data": {
+                "name": "config",
+                "options": [{"name": "set", "type": 1, "options": []}],
+            },
+        },
+    ),
+    "sub command group": (
+        legacy_command,
+        router_command,
+        {
+            "type": 2,
+            "data": {
+                "name": "config",
+                "options": [
+                    {
+                        "name": "roles",
+                        "type": 2,
+                        "options": [{"name": "add", "type": 1, "options": []}],
+                    }
+                ],
+            },
+        },
+    ),
+    "component": (
+        legacy_component,
+        router_component,
+        {"type": 3, "data": {"custom_id": "button-1044028103983734814"}},
+    ),
+    "encoded component": (
+        legacy_component,
+        router_component,
+        {"type": 3, "data": {"custom_id": "page:7xjx2pqp32fy:2"}},
+    ),
+    "autocomplete": (
+        legacy_autocomplete,
+        router_autocomplete,
+        {"type": 4, "data": {"name": "ping"}},
+    ),
+}
+
+
+def main():
+    cache, router = ApplicationCache(), Router()
+    for item in Bench().unpack():
+        cache.add_item(item)
+        router.add_item(item)
+
+    print(f"{'interaction':<20}{'legacy ns':>12}{'router ns':>12}{'speedup':>10}")
+    for name, (legacy, compiled, received) in CASES.items():
+        assert legacy(cache, received) is compiled(router, received)
+        before = min(
+            timeit.repeat(
+                lambda: legacy(cache, received), number=NUMBER, repeat=REPEAT
+            )
+        )
+        after = min(
+            timeit.repeat(
+                lambda: compiled(router, received), number=NUMBER, repeat=REPEAT
+            )
+        )
+        print(
+            f"{name:<20}{before / NUMBER * 1e9:>12.0f}"
+            f"{after / NUMBER * 1e9:>12.0f}{before / after:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
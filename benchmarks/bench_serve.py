@@ -0,0 +1,127 @@
+"""
+Throughput of serve() by number of workers
+
+Starts the server with 1 up to the number of CPUs workers and drives it with signed
+application commands from several client processes over keep-alive connections.
+Signature verification, JSON and dispatch are CPU bound, so requests per second
+should grow with the workers until the cores, shared with the clients, run out.
+
+    python benchmarks/bench_serve.py
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import pathlib
+import signal
+import subprocess
+import sys
+import time
+
+SRC = str(pathlib.Path(__file__).parents[1] / "src")
+sys.path.insert(0, SRC)
+
+PORT = 8799
+DURATION = 5.0
+CLIENTS = max(2, (os.cpu_count() or 1) // 2)
+CONNECTIONS = 32  # per client process
+SEED = bytes(range(32))
+USER = {"id": "10", "username": "bench", "discriminator": "0", "avatar": None}
+BODY = json.dumps(
+    {
+        "id": "1044028103983734814",
+        "application_id": "1",
+        "type": 2,
+        "data": {"id": "2", "name": "ping", "type": 1},
+        "channel_id": "3",
+        "user": USER,
+        "token": "token",
+        "version": 1,
+    }
+).encode()
+
+
+def serve(workers: int):
+    from nacl.signing import SigningKey
+
+    from disunity import DisunityServer, Package
+
+    class Bench(Package):
+        @Package.command("ping")
+        async def ping(self, ctx):
+            return {"type": 4, "data": {"content": "pong"}}
+
+    server = DisunityServer(SigningKey(SEED).verify_key.encode().hex(), "secret", 1)
+    server.register_package(Bench())
+    server.logger.disabled = True
+    server.serve(port=PORT, workers=workers)
+
+
+def client(results, deadline: float):
+    import aiohttp
+    from nacl.signing import SigningKey
+
+    key = SigningKey(SEED)
+
+    async def connection(session, count):
+        while time.time() < deadline:
+            timestamp = str(int(time.time()))
+            headers = {
+                "X-Signature-Ed25519": key.sign(timestamp.encode() + BODY).signature.hex(),
+                "X-Signature-Timestamp": timestamp,
+                "Content-Type": "application/json",
+            }
+            async with session.post(
+                f"http://127.0.0.1:{PORT}/interactions", data=BODY, headers=headers
+            ) as response:
+                await response.read()
+                count[0] += response.status == 200
+
+    async def main():
+        count = [0]
+        connector = aiohttp.TCPConnector(limit=CONNECTIONS)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(*(connection(session, count) for _ in range(CONNECTIONS)))
+        results.put(count[0])
+
+    asyncio.run(main())
+
+
+def throughput(workers: int) -> float:
+    server = subprocess.Popen(
+        [sys.executable, __file__, "--serve", str(workers)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        time.sleep(2 + workers * 0.2)  # let every worker start listening
+        results = multiprocessing.Queue()
+        deadline = time.time() + DURATION
+        clients = [
+            multiprocessing.Process(target=client, args=(results, deadline))
+            for _ in range(CLIENTS)
+        ]
+        for process in clients:
+            process.start()
+        total = sum(results.get() for _ in clients)
+        for process in clients:
+            process.join()
+        return total / DURATION
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+
+def main():
+    print(f"{'workers':<10}{'req/s':>10}")
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        print(f"{workers:<10}{throughput(workers):>10.0f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--serve"]:
+        serve(int(sys.argv[2]))
+    else:
+        main()
@@ -1,6 +1,33 @@
-from . import utils
+from typing import TYPE_CHECKING
+
+from . import custom_id, utils
 from .embed import Embed
-from .identifiers import SubOption
 from .models import Message, Attachment
-from .package import Package
-from .server import DisunityServer
+
+# Resolved on first access. The server pulls in the web stack and the declaration
+# helpers pull in asyncio, neither of which builders such as Embed and ActionRow need.
+_LAZY = {
+    "ChoiceIndex": "autocomplete",
+    "ConcurrencyLimit": "limits",
+    "Cooldown": "limits",
+    "DisunityServer": "server",
+    "Package": "package",
+    "SubOption": "identifiers",
+}
+
+if TYPE_CHECKING:
+    from .autocomplete import ChoiceIndex
+    from .identifiers import SubOption
+    from .limits import ConcurrencyLimit, Cooldown
+    from .package import Package
+    from .server import DisunityServer
+
+
+def __getattr__(name: str):
+    import importlib
+
+    if name in _LAZY:
+        return getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    if name in _LAZY.values():  # the submodules used to be imported eagerly
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+from . import errors
+from .rest import RESTClient
+
+
+class ClientCredentials:
+    """
+    Asynchronous OAuth2 client credentials provider
+
+    The token is refreshed in the background once `refresh_ratio` of its lifetime has
+    passed, so callers keep using the current token while the new one is fetched.
+    Concurrent callers share a single in-flight refresh.
+
+    Parameters
+    ----------
+    http: RESTClient
+        The client used to request the token.
+    client_id: int
+        The id of the application.
+    client_secret: str
+        The client secret of the application.
+    scope: str
+        The scopes to request. Defaults to 'applications.commands.update'.
+    refresh_ratio: float
+        Fraction of the token lifetime after which a background refresh is started.
+        Defaults to 0.5.
+    """
+
+    def __init__(
+        self,
+        http: RESTClient,
+        client_id: int,
+        client_secret: str,
+        scope: str = "applications.commands.update",
+        refresh_ratio: float = 0.5,
+    ):
+        self.http: RESTClient = http
+        self.client_id: int = client_id
+        self.client_secret: str = client_secret
+        self.scope: str = scope
+        self.refresh_ratio: float = refresh_ratio
+
+        self.token: None | str = None
+        self.expires_at: float = 0.0
+        self.refresh_at: float = 0.0
+
+        self.refreshes: int = 0
+        self.failures: int = 0
+        self.last_latency: float = 0.0
+        self.total_latency: float = 0.0
+        self.__inflight: None | asyncio.Task = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_latency": self.last_latency,
+            "average_latency": self.total_latency / self.refreshes
+            if self.refreshes
+            else 0.0,
+            "refreshing": self.__inflight is not None,
+        }
+
+    async def get_token(self) -> str:
+        """Returns a valid access token, only waiting on the network if the current
+        token is missing or already expired."""
+        now = time.monotonic()
+        if self.token is not None and now < self.expires_at:
+            if now >= self.refresh_at:
+                self.__start_refresh().add_done_callback(self.__silence)
+            return self.token
+
+        return await self.refresh()
+
+    async def refresh(self) -> str:
+        """Forces a refresh, joining the in-flight one if there is one."""
+        return await asyncio.shield(self.__start_refresh())
+
+    def __start_refresh(self) -> asyncio.Task:
+        if self.__inflight is None:
+            self.__inflight = asyncio.create_task(self.__fetch())
+        return self.__inflight
+
+    @staticmethod
+    def __silence(task: asyncio.Task):
+        # Background failures are already counted, and the next caller will retry
+        if not task.cancelled():
+            task.exception()
+
+    async def __fetch(self) -> str:
+        import aiohttp
+
+        started = time.monotonic()
+        try:
+            response = await self.http.request(
+                "POST",
+                "oauth2/token",
+                data={"grant_type": "client_credentials", "scope": self.scope},
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                auth=aiohttp.BasicAuth(str(self.client_id), self.client_secret),
+            )
+            data = await response.json()
+            if response.status != 200:
+                raise errors.HTTPRequestError(response.status, data)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.__inflight = None
+
+        finished = time.monotonic()
+        self.refreshes += 1
+        self.last_latency = finished - started
+        self.total_latency += self.last_latency
+
+        self.token = data["access_token"]
+        self.expires_at = finished + data["expires_in"]
+        self.refresh_at = finished + data["expires_in"] * self.refresh_ratio
+        return self.token
@@ -0,0 +1,237 @@
+"""
+Autocomplete result caching and static choice indexes
+
+Autocomplete requests arrive on every keystroke. AutocompleteCache keeps recent results
+keyed on (command, focused option qualified with its sub command path, typed text), and
+answers a longer prefix by filtering a cached result for a shorter one when that result
+was not cut off at the choice limit.
+ChoiceIndex serves large static choice sets from a sorted array with a binary search.
+CompletionTracker cancels a handler still running when a newer request for the same
+user, command and option arrives.
+
+Example
+-------
+COUNTRIES = ChoiceIndex(["Afghanistan", "Albania", ...])
+
+@Package.autocomplete("visit", index={"country": COUNTRIES})
+
+async def visit_autocomplete(self, ctx: Context):
+    ...  # only called for options without an index
+"""
+import asyncio
+import bisect
+import collections
+import time
+from typing import Iterable
+
+MAX_CHOICES = 25  # Discord shows at most 25 autocomplete choices
+MATCHES = ("prefix", "contains")
+
+
+def focused(options: list[dict]) -> tuple[tuple[str, ...], None | str, str]:
+    """
+    Returns the sub command path, name and typed value of the focused option
+
+    The path holds the group and sub command names the option is nested under, empty
+    for options of the command itself.
+    """
+    for option in options:
+        if option.get("focused", False):
+            return (), option["name"], str(option.get("value", ""))
+        if "options" in option:
+            path, name, value = focused(option["options"])
+            if name is not None:
+                return (option["name"], *path), name, value
+    return (), None, ""
+
+
+def option_key(path: tuple[str, ...], name: None | str) -> None | str:
+    """The focused option qualified with its sub command path, 'group sub option'."""
+    return None if name is None else " ".join((*path, name))
+
+
+def _matches(choice: dict, text: str, match: str) -> bool:
+    name = choice["name"].casefold()
+    return name.startswith(text) if match == "prefix" else text in name
+
+
+class AutocompleteCache:
+    """
+    LRU cache of autocomplete choices with a time to live per entry
+
+    Parameters
+    ----------
+    max_entries: int
+        Results kept before the least recently used are evicted. Defaults to 4096.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.derived_hits: int = 0
+        self.misses: int = 0
+        self.__entries: collections.OrderedDict[
+            tuple[str, None | str, str], tuple[float, list[dict], None | str]
+        ] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.__entries),
+            "hits": self.hits,
+            "derived_hits": self.derived_hits,
+            "misses": self.misses,
+        }
+
+    def __lookup(self, key: tuple, now: float) -> None | tuple:
+        entry = self.__entries.get(key, None)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self.__entries[key]
+            return None
+        self.__entries.move_to_end(key)
+        return entry
+
+    def get(self, command: str, option: None | str, text: str) -> None | list[dict]:
+        """
+        Returns the cached choices for `text`, or None
+
+        Without an exact entry, the longest shorter prefix with a complete result is
+        filtered down, if it was stored with a match mode.
+        """
+        now = time.monotonic()
+        entry = self.__lookup((command, option, text), now)
+        if entry is not None:
+            self.hits += 1
+            return entry[1]
+
+        folded = text.casefold()
+        for end in range(len(text) - 1, -1, -1):
+            entry = self.__lookup((command, option, text[:end]), now)
+            if entry is None:
+                continue
+            expires, choices, match = entry
+            if match is None or len(choices) >= MAX_CHOICES:
+                break  # longer prefixes may match choices cut off from this result
+            choices = [choice for choice in choices if _matches(choice, folded, match)]
+            self.__store((command, option, text), (expires, choices, match))
+            self.derived_hits += 1
+            return choices
+
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        command: str,
+        option: None | str,
+        text: str,
+        choices: list[dict],
+        ttl: float,
+        match: None | str = "prefix",
+    ):
+        """
+        Stores the choices returned for `text` for `ttl` seconds
+
+        Parameters
+        ----------
+        match: None | str
+            How the handler matched choices against the typed text, 'prefix' or
+            'contains' on the choice name, ignoring case. Longer prefixes are only
+            answered from this entry when given.
+        """
+        self.__store((command, option, text), (time.monotonic() + ttl, choices, match))
+
+    def __store(self, key: tuple, entry: tuple):
+        self.__entries[key] = entry
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+
+    def clear(self, command: None | str = None):
+        """Drops every entry, or those of a single command."""
+        if command is None:
+            self.__entries.clear()
+        else:
+            for key in [key for key in self.__entries if key[0] == command]:
+                del self.__entries[key]
+
+
+class CompletionTracker:
+    """
+    Keeps only the newest autocomplete handler running per key
+
+    Every keystroke sends a request, but only the newest result is shown. A request
+    arriving while an older one with the same key still runs cancels the older one.
+    """
+
+    def __init__(self):
+        self.superseded: int = 0
+        self.__running: dict[tuple, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self.__running)
+
+    @property
+    def stats(self) -> dict:
+        return {"running": len(self.__running), "superseded": self.superseded}
+
+    async def run(self, key: tuple, coroutine):
+        """Awaits `coroutine`, returning None if a newer one with the same key cancels it."""
+        previous = self.__running.get(key, None)
+        if previous is not None:
+            previous.cancel()
+
+        running = asyncio.ensure_future(coroutine)
+        self.__running[key] = running
+        try:
+            return await running
+        except asyncio.CancelledError:
+            if self.__running.get(key, None) is running:
+                raise  # the request itself was cancelled, not superseded
+            self.superseded += 1
+            return None
+        finally:
+            if self.__running.get(key, None) is running:
+                del self.__running[key]
+
+
+class ChoiceIndex:
+    """
+    Sorted index of a static choice set, searched by prefix
+
+    Parameters
+    ----------
+    choices: Iterable[str | dict]
+        Choice names, used as their value too, or choice dicts with 'name' and 'value'.
+    """
+
+    def __init__(self, choices: Iterable[str | dict]):
+        entries = sorted(
+            (
+                (choice.casefold(), {"name": choice, "value": choice})
+                if isinstance(choice, str)
+                else (choice["name"].casefold(), choice)
+                for choice in choices
+            ),
+            key=lambda entry: entry[0],
+        )
+        self.__keys: list[str] = [entry[0] for entry in entries]
+        self.__choices: list[dict] = [entry[1] for entry in entries]
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def search(self, text: str, limit: int = MAX_CHOICES) -> list[dict]:
+        """Returns up to `limit` choices whose name starts with `text`, ignoring case."""
+        text = text.casefold()
+        start = bisect.bisect_left(self.__keys, text)
+        end = start
+        stop = min(start + limit, len(self.__keys))
+        while end < stop and self.__keys[end].startswith(text):
+            end += 1
+        return self.__choices[start:end]
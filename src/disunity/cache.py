@@ -39,3 +39,44 @@ class ApplicationCache:
 
         else:
             raise TypeError
+
+    def remove_item(
+        self, outgoing: TopLevelSubCommand | Command | Component | Autocomplete
+    ):
+        if isinstance(outgoing, TopLevelSubCommand):
+            cacheable = self.commands.get("2", {}).get(str(outgoing.name), None)
+            if isinstance(cacheable, CacheableSubCommand):
+                cacheable.remove(outgoing)
+                if len(cacheable.map) == 1 and not cacheable.map["sub_commands"]:
+                    del self.commands["2"][str(outgoing.name)]
+
+        elif isinstance(outgoing, Command):
+            commands = self.commands.get(str(outgoing.command_type), {})
+            if commands.get(outgoing.name, None) is outgoing:
+                del commands[outgoing.name]
+
+        elif isinstance(outgoing, Component):
+            if self.components.get(str(outgoing.name), None) is outgoing:
+                del self.components[str(outgoing.name)]
+
+        elif isinstance(outgoing, Autocomplete):
+            if self.autocompletes.get(str(outgoing.command_name), None) is outgoing:
+                del self.autocompletes[str(outgoing.command_name)]
+
+        else:
+            raise TypeError
+
+    def copy(self) -> "ApplicationCache":
+        cache = ApplicationCache()
+        cache.commands = {
+            command_type: {
+                name: command.copy()
+                if isinstance(command, CacheableSubCommand)
+                else command
+                for name, command in commands.items()
+            }
+            for command_type, commands in self.commands.items()
+        }
+        cache.components = dict(self.components)
+        cache.autocompletes = dict(self.autocompletes)
+        return cache
@@ -0,0 +1,76 @@
+import json
+from typing import Any
+
+
+class JSONCodec:
+    """
+    Standard library JSON codec
+
+    Codecs encode straight to bytes so responses and request bodies can be written
+    without an intermediate str.
+    """
+
+    name: str = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """JSON codec backed by orjson. Requires `pip install orjson`."""
+
+    name: str = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+
+class MsgspecCodec(JSONCodec):
+    """JSON codec backed by msgspec. Requires `pip install msgspec`."""
+
+    name: str = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self.dumps = msgspec.json.Encoder().encode
+        self.loads = msgspec.json.Decoder().decode
+
+
+CODECS: dict[str, type[JSONCodec]] = {
+    codec.name: codec for codec in (JSONCodec, OrjsonCodec, MsgspecCodec)
+}
+
+
+def get_codec(codec: None | str | JSONCodec = None) -> JSONCodec:
+    """
+    Resolves a codec from its name
+
+    Parameters
+    ----------
+    codec: None | str | JSONCodec
+        'json', 'orjson', 'msgspec' or a codec instance. None gives the standard library
+        codec.
+
+    Raises
+    ------
+    ValueError
+        The codec name is unknown.
+    ImportError
+        The library backing the codec is not installed.
+    """
+    if codec is None:
+        return JSONCodec()
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec not in CODECS:
+        raise ValueError(
+            f"Unknown JSON codec {codec}, expected one of {', '.join(CODECS)}"
+        )
+    return CODECS[codec]()
@@ -0,0 +1,99 @@
+import collections
+import sys
+import time
+
+INT_SIZE = sys.getsizeof(1 << 62)  # a snowflake held as an int
+
+
+class InteractionDeduplicator:
+    """
+    Remembers the interaction ids received within the last `ttl` seconds
+
+    Ids are kept in a ring of sets that each cover `ttl / buckets` seconds. A whole set
+    expires at once, so nothing is scanned per request, and memory is bounded by the
+    ids received within `ttl`, or by `max_entries` during bursts. A set is also closed
+    once it holds its share of `max_entries`, so a burst drops the oldest ids early
+    rather than growing.
+
+    Parameters
+    ----------
+    ttl: float
+        Seconds an id is remembered for. Defaults to 900, the lifetime of an
+        interaction token, after which a redelivery can not be answered anyway.
+    buckets: int
+        Number of sets the window is split in. Defaults to 15.
+    max_entries: int
+        Ids remembered at most. Defaults to 200,000.
+    """
+
+    def __init__(
+        self, ttl: float = 900.0, buckets: int = 15, max_entries: int = 200_000
+    ):
+        self.ttl: float = ttl
+        self.buckets: int = buckets
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.checked: int = 0
+        self.__width: float = ttl / buckets
+        self.__size: int = 0
+        self.__sets: collections.deque[tuple[int, set[int]]] = collections.deque()
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def memory(self) -> int:
+        """Approximate bytes held by the remembered ids."""
+        return sum(sys.getsizeof(ids) for _, ids in self.__sets) + (
+            self.__size * INT_SIZE
+        )
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "entries": self.__size,
+            "checked": self.checked,
+            "hits": self.hits,
+            "memory": self.memory,
+        }
+
+    def seen(self, interaction_id: int | str) -> bool:
+        """Returns True if the id was already seen, otherwise remembers it."""
+        interaction_id = int(interaction_id)
+        current = int(time.monotonic() // self.__width)
+        self.checked += 1
+
+        while self.__sets and self.__sets[0][0] < current - self.buckets:
+            self.__size -= len(self.__sets.popleft()[1])
+
+        for _, ids in self.__sets:
+            if interaction_id in ids:
+                self.hits += 1
+                return True
+
+        if (
+            not self.__sets
+            or self.__sets[-1][0] != current
+            or len(self.__sets[-1][1]) >= self.max_entries // self.buckets
+        ):
+            self.__sets.append((current, set()))
+        self.__sets[-1][1].add(interaction_id)
+        self.__size += 1
+
+        while self.__size > self.max_entries and len(self.__sets) > 1:
+            self.__size -= len(self.__sets.popleft()[1])
+
+        return False
+
+    def forget(self, interaction_id: int | str):
+        """Drops a remembered id, so a redelivery of an unanswered interaction passes."""
+        interaction_id = int(interaction_id)
+        for _, ids in self.__sets:
+            if interaction_id in ids:
+                ids.discard(interaction_id)
+                self.__size -= 1
+                return
+
+    def clear(self):
+        self.__sets.clear()
+        self.__size = 0
@@ -20,8 +20,21 @@ class AutocompleteNotFound(Exception):
         )
 
 
+class PackageNotLoaded(Exception):
+    def __init__(self, package_path):
+        super().__init__(f"No package was loaded from {package_path}")
+
+
 class HTTPRequestError(Exception):
     def __init__(self, status_code, error_message):
         super().__init__(
             f"HTTP request returned with status {status_code}: {error_message}"
         )
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after):
+        super().__init__(
+            f"Requests to Discord are failing, rejecting for another {retry_after:.2f} seconds"
+        )
+        self.retry_after = retry_after
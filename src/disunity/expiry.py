@@ -0,0 +1,208 @@
+import asyncio
+import collections
+import logging
+import math
+import time
+from typing import Awaitable, Callable, Hashable
+
+MODES = ("remove", "disable")
+
+
+def expired(
+    components: list[dict], custom_ids: None | set[str], mode: str
+) -> list[dict]:
+    """
+    Returns a copy of action rows with the components in `custom_ids`, or every
+    component if None, disabled or removed depending on `mode`
+
+    Rows left without components are removed.
+    """
+    rows = []
+    for row in components:
+        items = []
+        for item in row["components"]:
+            if custom_ids is not None and item.get("custom_id", None) not in custom_ids:
+                items.append(item)
+            elif mode == "disable":
+                items.append(dict(item, disabled=True))
+        if items:
+            rows.append(dict(row, components=items))
+    return rows
+
+
+class ComponentExpiry:
+    """
+    Hashed timer wheel of sent messages whose components expire
+
+    Each tracked message sits in the slot of the tick it expires on, so tracking and
+    expiring are constant time however many messages are live. A message is tracked
+    once per key, tracking it again replaces the earlier entry, which is skipped when
+    its slot comes up. On every tick the due messages are edited, in batches of
+    `batch_size` concurrent requests that go through the client's rate limiter.
+    Whatever a tick can not finish carries over to the next.
+
+    Parameters
+    ----------
+    edit: Callable[[str, dict], Awaitable]
+        Sends the PATCH to a message route with the given payload.
+    mode: str
+        'disable' greys the expiring components out, 'remove' takes them off the
+        message. Other components, such as link buttons, are left as they are.
+        Defaults to 'disable'.
+    tick: float
+        Seconds between sweeps. Defaults to 1.
+    slots: int
+        Slots of the wheel. Defaults to 1024.
+    batch_size: int
+        Edits sent at once. Defaults to 16.
+    logger: Optional[logging.Logger]
+        Where failed edits are logged. Defaults to the 'disunity' logger.
+    """
+
+    def __init__(
+        self,
+        edit: Callable[[str, dict], Awaitable],
+        mode: str = "disable",
+        tick: float = 1.0,
+        slots: int = 1024,
+        batch_size: int = 16,
+        logger: None | logging.Logger = None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+
+        self.mode: str = mode
+        self.__tick: float = tick
+        self.batch_size: int = batch_size
+        self.logger: logging.Logger = logger or logging.getLogger("disunity")
+        self.expired: int = 0
+        self.failed: int = 0
+        self.__edit = edit
+        # entries are (due tick, key, route, components, expiring custom_ids)
+        self.__wheel: list[list[tuple]] = [[] for _ in range(slots)]
+        self.__entries: dict[Hashable, tuple] = {}  # key -> its live entry
+        self.__current: int = self.__tick_of(time.time())
+        self.__due: collections.deque[
+            tuple[str, list, None | set[str]]
+        ] = collections.deque()
+        self.__task: None | asyncio.Task = None
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def tick(self) -> float:
+        return self.__tick
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "tracked": len(self.__entries),
+            "due": len(self.__due),
+            "expired": self.expired,
+            "failed": self.failed,
+        }
+
+    def __tick_of(self, timestamp: float) -> int:
+        return int(timestamp // self.__tick)
+
+    def track(
+        self,
+        route: str,
+        expires_at: float,
+        components: list,
+        expiring: None | set[str] = None,
+        key: None | Hashable = None,
+    ):
+        """
+        Schedules the components of the message at `route` to expire
+
+        Parameters
+        ----------
+        route: str
+            The message route, relative to the API base url.
+        expires_at: float
+            When the components expire, in seconds since the Unix epoch.
+        components: list
+            The message's action rows.
+        expiring: Optional[set[str]]
+            The custom_ids of the components that expire, None for all of them.
+        key: Optional[Hashable]
+            Identifies the message, an earlier entry under the same key is replaced.
+            Defaults to the route.
+        """
+        due = max(math.ceil(expires_at / self.__tick), self.__current + 1)
+        entry = (due, route if key is None else key, route, components, expiring)
+        self.__entries[entry[1]] = entry
+        self.__wheel[due % len(self.__wheel)].append(entry)
+
+    def advance(self, now: None | float = None):
+        """Moves the messages due by `now` to the queue of edits."""
+        target = self.__tick_of(time.time() if now is None else now)
+        if target - self.__current >= len(self.__wheel):
+            # fell behind a whole turn, every slot has to be looked at once
+            indexes = range(len(self.__wheel))
+        else:
+            indexes = (
+                tick % len(self.__wheel) for tick in range(self.__current + 1, target + 1)
+            )
+        self.__current = max(self.__current, target)
+
+        for index in indexes:
+            slot = self.__wheel[index]
+            if not slot:
+                continue
+
+            pending = []
+            for entry in slot:
+                if self.__entries.get(entry[1], None) is not entry:
+                    continue  # replaced since
+                if entry[0] <= target:
+                    del self.__entries[entry[1]]
+                    self.__due.append(entry[2:])
+                else:
+                    pending.append(entry)
+            self.__wheel[index] = pending
+
+    async def sweep(self):
+        """Edits the due messages, `batch_size` at a time."""
+        while self.__due:
+            batch = [
+                self.__due.popleft()
+                for _ in range(min(self.batch_size, len(self.__due)))
+            ]
+            results = await asyncio.gather(
+                *(
+                    self.__edit(
+                        route,
+                        {"components": expired(components, expiring, self.mode)},
+                    )
+                    for route, components, expiring in batch
+                ),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    self.failed += 1
+                    self.logger.debug("Could not expire components: %s", result)
+                else:
+                    self.expired += 1
+
+    async def __run(self):
+        while True:
+            await asyncio.sleep(self.__tick - time.time() % self.__tick)
+            self.advance()
+            await self.sweep()
+
+    async def start(self):
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
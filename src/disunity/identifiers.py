@@ -1,6 +1,10 @@
-from datetime import datetime, timezone
+import time
 from typing import Callable
 
+from . import custom_id, utils
+from .autocomplete import MATCHES, ChoiceIndex
+from .limits import SERIALIZE_KEYS, ConcurrencyLimit, Cooldown
+
 
 class SubOption:
     """
@@ -14,16 +18,25 @@ class SubOption:
         Does the command need to be acked (response using followup). Default
         to False
     requires_ephemeral : bool
-        Only required if requires_ack is true. Sets the initial ack message
-        to show ephemerally so following responses can be ephemeral.
+        Only required if requires_ack or auto_defer is true. Sets the initial
+        ack message to show ephemerally so following responses can be ephemeral.
+    auto_defer : bool | float | None
+        Defer the response if the sub command has not answered within this
+        many seconds, True for the server's AUTO_DEFER_BUDGET. None inherits
+        the value given to Package.sub.
     """
 
     def __init__(
-        self, name: str, requires_ack: bool = False, requires_ephemeral: bool = False
+        self,
+        name: str,
+        requires_ack: bool = False,
+        requires_ephemeral: bool = False,
+        auto_defer: None | bool | float = None,
     ):
         self.name: str = name
         self.ack: bool = requires_ack
         self.ephemeral: bool = requires_ephemeral
+        self.auto_defer: None | bool | float = auto_defer
 
 
 class SubCommand(SubOption):
@@ -33,10 +46,20 @@ class SubCommand(SubOption):
         coroutine: Callable,
         requires_ack: bool = False,
         requires_ephemeral: bool = False,
+        auto_defer: bool | float = False,
+        time_limit: None | float = None,
+        fallback: None | dict = None,
+        cooldown: None | Cooldown = None,
+        max_concurrency: None | ConcurrencyLimit = None,
     ):
-        super().__init__(name, requires_ack, requires_ephemeral)
+        super().__init__(name, requires_ack, requires_ephemeral, auto_defer)
         self.name: str = name
+        self.qualified_name: str = name
         self.coroutine: Callable = coroutine
+        self.time_limit: None | float = time_limit
+        self.fallback: None | dict = fallback
+        self.cooldown: None | Cooldown = cooldown
+        self.max_concurrency: None | ConcurrencyLimit = max_concurrency
 
     async def __call__(self, context):
         try:
@@ -54,35 +77,44 @@ class TopLevelSubCommand:
         coroutine: Callable,
         sub_commands: list[str] | list[SubCommand] | SubCommand | str = [],
         group: str | None = None,
+        auto_defer: bool | float = False,
+        time_limit: None | float = None,
+        fallback: None | dict = None,
+        cooldown: None | Cooldown = None,
+        max_concurrency: None | ConcurrencyLimit = None,
     ):
         self.name: str = name
         self.coroutine: Callable = coroutine
         self.sub_commands = []
         self.group = group
+        self.auto_defer: bool | float = auto_defer
+        self.time_limit: None | float = time_limit
+        self.fallback: None | dict = fallback
+        self.cooldown: None | Cooldown = cooldown
+        self.max_concurrency: None | ConcurrencyLimit = max_concurrency
 
-        if isinstance(sub_commands, str):
-            self.sub_commands.append(
-                SubCommand(sub_commands, self.coroutine, False, False)
-            )
-        elif isinstance(sub_commands, list):
-            for sub in sub_commands:
-                if isinstance(sub, str):
-                    self.sub_commands.append(
-                        SubCommand(sub, self.coroutine, False, False)
-                    )
-                elif isinstance(sub, SubOption):
-                    self.sub_commands.append(
-                        SubCommand(sub.name, self.coroutine, sub.ack, sub.ephemeral)
-                    )
-        elif isinstance(sub_commands, SubOption):
-            self.sub_commands.append(
-                SubCommand(
-                    sub_commands.name,
+        if not isinstance(sub_commands, list):
+            sub_commands = [sub_commands]
+
+        for sub in sub_commands:
+            if isinstance(sub, str):
+                sub = SubOption(sub)
+            if isinstance(sub, SubOption):
+                sub_command = SubCommand(
+                    sub.name,
                     self.coroutine,
-                    sub_commands.ack,
-                    sub_commands.ephemeral,
+                    sub.ack,
+                    sub.ephemeral,
+                    auto_defer if sub.auto_defer is None else sub.auto_defer,
+                    time_limit,
+                    fallback,
+                    cooldown,
+                    max_concurrency,
                 )
-            )
+                sub_command.qualified_name = " ".join(
+                    part for part in (name, group, sub.name) if part is not None
+                )
+                self.sub_commands.append(sub_command)
 
 
 class CacheableSubCommand:
@@ -101,6 +133,22 @@ class CacheableSubCommand:
 
         return self
 
+    def remove(self, outgoing: TopLevelSubCommand):
+        group = "sub_commands" if outgoing.group is None else str(outgoing.group)
+        subs = self.map.get(group, {})
+        for sub in outgoing.sub_commands:
+            if subs.get(str(sub.name), None) is sub:
+                del subs[str(sub.name)]
+        if not subs and group != "sub_commands":
+            self.map.pop(group, None)
+
+        return self
+
+    def copy(self) -> "CacheableSubCommand":
+        cacheable = CacheableSubCommand(self.name)
+        cacheable.map = {group: dict(subs) for group, subs in self.map.items()}
+        return cacheable
+
 
 class Component:
     def __init__(
@@ -110,19 +158,40 @@ class Component:
         requires_ack: bool = False,
         requires_ephemeral: bool = False,
         timeout: float = 0.0,
+        args: None | tuple[type, ...] = None,
+        auto_defer: bool | float = False,
+        time_limit: None | float = None,
+        fallback: None | dict = None,
+        cooldown: None | Cooldown = None,
+        max_concurrency: None | ConcurrencyLimit = None,
+        serialize: None | str | Callable = None,
+        state: bool = False,
     ):
+        if isinstance(serialize, str) and serialize not in SERIALIZE_KEYS:
+            raise ValueError(
+                f"serialize must be one of {', '.join(SERIALIZE_KEYS)} or a function"
+            )
+
         self.name: str = name
         self.coroutine: Callable = coroutine
         self.ack: bool = requires_ack
         self.ephemeral: bool = requires_ephemeral
         self.timeout: float | None = None if timeout <= 0.0 else timeout
+        self.args: None | tuple[type, ...] = args
+        self.auto_defer: bool | float = auto_defer
+        self.time_limit: None | float = time_limit
+        self.fallback: None | dict = fallback
+        self.cooldown: None | Cooldown = cooldown
+        self.max_concurrency: None | ConcurrencyLimit = max_concurrency
+        self.serialize: None | str | Callable = serialize
+        self.state: bool = state
 
     async def __call__(self, context):
         if isinstance(self.timeout, float):
             if (
-                datetime.now(timezone.utc)
-                - datetime.fromisoformat(context.raw["message"]["timestamp"])
-            ).total_seconds() > self.timeout:
+                time.time() - utils.snowflake_time(context.raw["message"]["id"])
+                > self.timeout
+            ):
                 if not self.ack:
                     return {
                         "type": 4,
@@ -133,7 +202,17 @@ class Component:
                     }
 
         try:
-            response = await self.coroutine(context)
+            if self.args is None:
+                response = await self.coroutine(context)
+            elif self.state:  # the first argument is the state token
+                response = await self.coroutine(
+                    context,
+                    *custom_id.decode(context.custom_id, (str, *self.args))[1:],
+                )
+            else:
+                response = await self.coroutine(
+                    context, *custom_id.decode(context.custom_id, self.args)
+                )
             if isinstance(response, dict):
                 return response
         except Exception as e:
@@ -147,12 +226,22 @@ class Command:
         coroutine: Callable,
         requires_ack: bool = False,
         requires_ephemeral: bool = False,
+        auto_defer: bool | float = False,
+        time_limit: None | float = None,
+        fallback: None | dict = None,
+        cooldown: None | Cooldown = None,
+        max_concurrency: None | ConcurrencyLimit = None,
     ):
         self.name: str = name
         self.command_type: int = 2
         self.coroutine: Callable = coroutine
         self.ack: bool = requires_ack
         self.ephemeral: bool = requires_ephemeral
+        self.auto_defer: bool | float = auto_defer
+        self.time_limit: None | float = time_limit
+        self.fallback: None | dict = fallback
+        self.cooldown: None | Cooldown = cooldown
+        self.max_concurrency: None | ConcurrencyLimit = max_concurrency
 
     async def __call__(self, context):
         try:
@@ -164,9 +253,28 @@ class Command:
 
 
 class Autocomplete:
-    def __init__(self, command_name: str, coroutine: Callable):
+    def __init__(
+        self,
+        command_name: str,
+        coroutine: Callable,
+        time_limit: None | float = None,
+        fallback: None | list[dict] = None,
+        cache_ttl: float = 0.0,
+        cache_match: None | str = "prefix",
+        index: None | dict[str, ChoiceIndex] = None,
+        supersede: bool = False,
+    ):
+        if cache_match is not None and cache_match not in MATCHES:
+            raise ValueError(f"cache_match must be one of {', '.join(MATCHES)} or None")
+
         self.command_name: str = command_name
         self.coroutine: Callable = coroutine
+        self.time_limit: None | float = time_limit
+        self.fallback: None | list[dict] = fallback
+        self.cache_ttl: float = cache_ttl
+        self.cache_match: None | str = cache_match
+        self.index: dict[str, ChoiceIndex] = index or {}
+        self.supersede: bool = supersede
 
     async def __call__(self, context):
         try:
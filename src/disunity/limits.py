@@ -0,0 +1,290 @@
+"""
+Declarative limits on how often commands and components run
+
+Example
+-------
+@Package.command("roll", cooldown=Cooldown(3, 10.0, scope="user"))
+
+async def roll(self, ctx: Context):
+    ...
+
+@Package.command("render", max_concurrency=ConcurrencyLimit(4, max_waiting=64))
+
+async def render(self, ctx: Context):
+    ...
+"""
+import asyncio
+import collections
+import contextlib
+import time
+from typing import Callable, Hashable
+
+SCOPES = ("user", "guild", "channel", "global")
+OVERFLOWS = ("reject", "defer")
+SERIALIZE_KEYS = ("message", "user")
+
+
+def scope_key(context, scope: str) -> None | int:
+    """
+    The id a limit is tracked under for an interaction
+
+    User scoped limits key on the user who sent the interaction, so for components the
+    one clicking. Guild scoped limits fall back to the user in DMs. Global limits share
+    a single key.
+    """
+    if scope == "user":
+        return context.user_id
+    if scope == "guild":
+        guild_id = context.guild_id
+        return context.user_id if guild_id is None else guild_id
+    if scope == "channel":
+        return context.channel_id
+    return None
+
+
+class Cooldown:
+    """
+    Token bucket allowing `rate` uses every `per` seconds, for each user, guild, channel
+    or globally
+
+    Only keys that used the command recently are tracked. A key whose bucket has refilled
+    is dropped, as it behaves the same as a key that was never seen, so the state stays
+    proportional to recent users rather than to every user seen. The same instance can
+    be given to several commands to share a limit between them.
+
+    Parameters
+    ----------
+    rate: int
+        Uses allowed in a burst.
+    per: float
+        Seconds for the bucket to refill completely.
+    scope: str
+        'user', 'guild', 'channel' or 'global'. Defaults to 'user'.
+    message: Optional[str]
+        Ephemeral response sent when throttled, formatted with `retry_after`. Defaults
+        to the server's COOLDOWN_MESSAGE.
+    max_keys: int
+        Keys tracked at most, the least recently used are dropped first. Defaults to
+        100,000.
+    """
+
+    def __init__(
+        self,
+        rate: int,
+        per: float,
+        scope: str = "user",
+        message: None | str = None,
+        max_keys: int = 100_000,
+    ):
+        if scope not in SCOPES:
+            raise ValueError(f"scope must be one of {', '.join(SCOPES)}")
+
+        self.rate: int = rate
+        self.per: float = per
+        self.scope: str = scope
+        self.message: None | str = message
+        self.max_keys: int = max_keys
+        self.throttled: int = 0
+        # key -> (tokens left, last update), oldest update first
+        self.__buckets: collections.OrderedDict[
+            None | int, tuple[float, float]
+        ] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__buckets)
+
+    @property
+    def stats(self) -> dict:
+        return {"tracked": len(self.__buckets), "throttled": self.throttled}
+
+    def hit(self, context) -> float:
+        """
+        Takes a use for the interaction's key
+
+        Returns 0 if allowed, otherwise the seconds until a use is available.
+        """
+        now = time.monotonic()
+        while self.__buckets:
+            oldest = next(iter(self.__buckets.values()))
+            if now - oldest[1] < self.per and len(self.__buckets) <= self.max_keys:
+                break
+            self.__buckets.popitem(last=False)
+
+        key = scope_key(context, self.scope)
+        tokens, updated = self.__buckets.pop(key, (self.rate, now))
+        tokens = min(self.rate, tokens + (now - updated) * self.rate / self.per)
+
+        if tokens >= 1:
+            self.__buckets[key] = (tokens - 1, now)
+            return 0.0
+
+        self.__buckets[key] = (tokens, now)
+        self.throttled += 1
+        return (1 - tokens) * self.per / self.rate
+
+    def reset(self, context=None):
+        """Refills the bucket of the interaction's key, or every bucket."""
+        if context is None:
+            self.__buckets.clear()
+        else:
+            self.__buckets.pop(scope_key(context, self.scope), None)
+
+
+class ConcurrencyLimit:
+    """
+    Caps how many interactions run a handler at once, for each user, guild, channel or
+    globally
+
+    Interactions over the limit either get an ephemeral message, or with the 'defer'
+    overflow policy are deferred and wait in a bounded queue for a slot. Keys with
+    nothing running or waiting are dropped.
+
+    Parameters
+    ----------
+    limit: int
+        Interactions allowed to run at once per key.
+    scope: str
+        'user', 'guild', 'channel' or 'global'. Defaults to 'global'.
+    max_waiting: int
+        Interactions allowed to wait for a slot per key. Defaults to 32.
+    overflow: str
+        'reject' answers interactions over the limit with `message`, 'defer' defers them
+        and waits while the queue has room. Defaults to 'defer'.
+    message: Optional[str]
+        Ephemeral response sent when rejected. Defaults to the server's
+        CONCURRENCY_MESSAGE.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        scope: str = "global",
+        max_waiting: int = 32,
+        overflow: str = "defer",
+        message: None | str = None,
+    ):
+        if scope not in SCOPES:
+            raise ValueError(f"scope must be one of {', '.join(SCOPES)}")
+        if overflow not in OVERFLOWS:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOWS)}")
+
+        self.limit: int = limit
+        self.scope: str = scope
+        self.max_waiting: int = max_waiting
+        self.overflow: str = overflow
+        self.message: None | str = message
+        self.rejected: int = 0
+        self.__active: dict[None | int, int] = {}
+        self.__waiting: dict[None | int, collections.deque[asyncio.Future]] = {}
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "active": sum(self.__active.values()),
+            "waiting": sum(len(waiting) for waiting in self.__waiting.values()),
+            "keys": len(self.__active),
+            "rejected": self.rejected,
+        }
+
+    def occupancy(self, key: None | int = None) -> tuple[int, int]:
+        """Returns how many interactions run and wait under `key`."""
+        return self.__active.get(key, 0), len(self.__waiting.get(key, ()))
+
+    def reserve(self, key: None | int, wait: bool = True) -> None | asyncio.Future:
+        """
+        Takes a slot, or a place in the queue with the 'defer' overflow policy
+
+        Returns a future resolved once the slot is held, or None if the interaction is
+        rejected. Every resolved reservation must be released. With `wait` False the
+        interaction is rejected instead of queued, whatever the overflow policy.
+        """
+        slot = asyncio.get_running_loop().create_future()
+        active = self.__active.get(key, 0)
+        if active < self.limit:
+            self.__active[key] = active + 1
+            slot.set_result(None)
+            return slot
+
+        if wait and self.overflow == "defer":
+            waiting = self.__waiting.setdefault(key, collections.deque())
+            if len(waiting) < self.max_waiting:
+                waiting.append(slot)
+                return slot
+            if not waiting:
+                del self.__waiting[key]
+
+        self.rejected += 1
+        return None
+
+    def release(self, key: None | int):
+        """Hands the slot to the next waiting interaction, or frees it."""
+        waiting = self.__waiting.get(key, None)
+        while waiting:
+            slot = waiting.popleft()
+            if not slot.done():
+                slot.set_result(None)
+                break
+        else:
+            self.__active[key] -= 1
+            if not self.__active[key]:
+                del self.__active[key]
+
+        if waiting is not None and not waiting:
+            del self.__waiting[key]
+
+    def cancel(self, key: None | int, slot: asyncio.Future):
+        """Gives up a reservation, whether or not its slot was handed over yet."""
+        if slot.done() and not slot.cancelled():
+            self.release(key)
+            return
+
+        slot.cancel()
+        waiting = self.__waiting.get(key, None)
+        if waiting is not None and slot in waiting:
+            waiting.remove(slot)
+            if not waiting:
+                del self.__waiting[key]
+
+
+def serial_key(context, serialize: str | Callable) -> Hashable:
+    """
+    The key component interactions are serialized on
+
+    Interactions without a message, such as modals submitted from a command, are only
+    serialized with themselves. 'user' is the user who clicked or submitted.
+    """
+    if serialize == "message":
+        message = context.raw.get("message", None)
+        return ("message", context.id if message is None else int(message["id"]))
+    if serialize == "user":
+        return ("user", context.user_id)
+    return ("key", serialize(context))
+
+
+class KeyedLock:
+    """
+    One lock per key, existing only while it is held or waited on
+
+    Work under different keys runs in parallel, work under the same key runs in arrival
+    order. Memory follows the number of keys in use rather than the number ever seen.
+    """
+
+    def __init__(self):
+        self.__locks: dict[Hashable, list] = {}  # key -> [lock, holders and waiters]
+
+    def __len__(self) -> int:
+        return len(self.__locks)
+
+    @contextlib.asynccontextmanager
+    async def hold(self, key: Hashable):
+        entry = self.__locks.get(key, None)
+        if entry is None:
+            entry = self.__locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self.__locks[key]
@@ -0,0 +1,60 @@
+"""
+Manifest of the routes each package module registers
+
+The server can register the routes of a manifest without importing the packages, which
+are then imported when first used. Build it whenever packages change, for example as a
+deploy step:
+
+    server.save_manifest("manifest.json", ["packages.games", "packages.images"])
+
+and load it instead of the packages:
+
+    server.load_manifest("manifest.json", warm=True)
+"""
+import json
+
+from .identifiers import Autocomplete, Command, Component, TopLevelSubCommand
+from .utils import InteractionTypes
+
+VERSION = 1
+
+
+def describe(items: list) -> dict:
+    """Lists the routes of the items unpacked from a module's packages."""
+    routes = {"commands": [], "components": [], "autocompletes": []}
+    for item in items:
+        if isinstance(item, TopLevelSubCommand):
+            routes["commands"].extend(
+                [InteractionTypes.APPLICATION_COMMAND, item.name, item.group, sub.name]
+                for sub in item.sub_commands
+            )
+        elif isinstance(item, Command):
+            routes["commands"].append([item.command_type, item.name, None, None])
+        elif isinstance(item, Component):
+            routes["components"].append(item.name)
+        elif isinstance(item, Autocomplete):
+            routes["autocompletes"].append(item.command_name)
+    return routes
+
+
+def dump(manifest: dict, path: str):
+    with open(path, "w") as file:
+        json.dump(manifest, file, indent=2)
+
+
+def load(path: str) -> dict:
+    """
+    Reads a manifest file
+
+    Raises
+    ------
+    ValueError
+        The manifest was written by an incompatible version.
+    """
+    with open(path) as file:
+        manifest = json.load(file)
+    if manifest.get("version", None) != VERSION:
+        raise ValueError(
+            f"Unsupported manifest version {manifest.get('version')}, rebuild it"
+        )
+    return manifest
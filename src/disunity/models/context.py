@@ -1,4 +1,4 @@
-from .. import embed, errors, utils
+from .. import custom_id, embed, errors, utils
 from .components import ActionRow, Modal
 from .interaction import Interaction
 from .message import Message
@@ -6,15 +6,55 @@ from .attachment import Attachment
 
 
 class Context(Interaction):
+    __slots__ = ("_app", "acked", "_deferred", "_options", "state", "_state_token")
+
     def __init__(self, app, received: dict):
         super().__init__(received)
         self._app = app
         self.acked: bool = False
-        self.options = {}
+        self._deferred: bool = False  # set by the server once it sent a deferred response
+        self._options: None | dict = None
+        self.state = None
+        self._state_token: None | str = None
+
+    @property
+    def options(self) -> dict:
+        if self._options is None:
+            self._options = {
+                option["name"]: option["value"]
+                for option in self.raw.get("data", {}).get("injected", [])
+            }
+        return self._options
+
+    async def stateful_custom_id(self, name: str, state, *args) -> str:
+        """
+        Stores `state` on the server and builds a custom_id routing to the component
+        `name`, which receives it as ctx.state when declared with state=True
+
+        Parameters
+        ----------
+        name: str
+            The component name.
+        state: Any
+            The state, JSON serializable for persistent stores.
+        args: Any
+            Further arguments packed into the custom_id, see custom_id.encode.
+        """
+        return await self._app.store_state(name, state, *args)
+
+    async def save_state(self):
+        """Stores changes made to ctx.state, restarting its time to live."""
+        if self._state_token is None:
+            raise errors.InvalidMethodUse("This interaction has no component state")
+        await self._app.store_state(
+            custom_id.prefix(self.custom_id), self.state, token=self._state_token
+        )
 
-        if "data" in received:
-            for option in received["data"].get("injected", []):
-                self.options[option["name"]] = option["value"]
+    async def drop_state(self):
+        """Deletes the component state, for components that are done."""
+        if self._state_token is not None:
+            await self._app.state_store.delete(self._state_token)
+            self.state = self._state_token = None
 
     async def callback(
         self,
@@ -133,6 +173,7 @@ class Context(Interaction):
             payload=message_body,
             files=files,
         )
+        self._app.track_components(self, message_body, maybe_message["id"])
 
         return Message(maybe_message, self._app, self.token)
 
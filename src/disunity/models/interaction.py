@@ -3,51 +3,125 @@ from ..errors import InvalidMethodUse
 from .member import Member
 from .user import User
 
+_MISSING = object()
+
 
 class Interaction:
+    """
+    Interaction received from Discord
+
+    Fields are decoded from the raw payload when first accessed, so handlers only pay
+    for the parts of the interaction they read.
+    """
+
+    __slots__ = ("raw", "_invoked_by", "_used_by", "_member")
+
     def __init__(self, received):
         self.raw: dict = received
-        self.app_permissions: int = int(received.get("app_permissions", 0))
-
-        self.channel_id: int = int(received["channel_id"])
-        self.id: int = int(received["id"])
-        self.locale: str = received["locale"]
-        self.token: str = received["token"]
-        self.interaction_type: int = int(received["type"])
-        self.data: dict = received["data"]
-        self.resolved: None | dict = self.data.get("resolved", None)
-        self.component_type: None | int = self.data.get("component_type", None)
-        self.custom_id: None | str = self.data.get("custom_id", None)
-        self.values: list = self.data.get("values", [])
-        self.member: None | Member = None
-        self.used_by: None | User = None
-        self.command_name: str = self.data.get("name", None)
-        self.modal_values: None | list[dict] = None
-
-        if "member" in received:  # Not a DM command
-            self.invoked_by: User = User(received["member"]["user"])
-            self.member = Member(received["member"])
-        else:
-            self.invoked_by: User = User(received["user"])
-
-        if (
-            self.interaction_type == utils.InteractionTypes.MESSAGE_COMPONENT
-        ):  # Component
-            if "interaction" in received["message"]:
-                self.invoked_by: User = User(received["message"]["interaction"]["user"])
-            else:
-                self.invoked_by: User = None
-            if "member" in received:
-                self.used_by: None | User = User(received["member"]["user"])
+        self._invoked_by = self._used_by = self._member = _MISSING
+
+    @property
+    def app_permissions(self) -> int:
+        return int(self.raw.get("app_permissions", 0))
+
+    @property
+    def channel_id(self) -> int:
+        return int(self.raw["channel_id"])
+
+    @property
+    def guild_id(self) -> None | int:
+        guild_id = self.raw.get("guild_id", None)
+        return None if guild_id is None else int(guild_id)
+
+    @property
+    def id(self) -> int:
+        return int(self.raw["id"])
+
+    @property
+    def locale(self) -> str:
+        return self.raw["locale"]
+
+    @property
+    def token(self) -> str:
+        return self.raw["token"]
+
+    @property
+    def interaction_type(self) -> int:
+        return int(self.raw["type"])
+
+    @property
+    def data(self) -> dict:
+        return self.raw["data"]
+
+    @property
+    def resolved(self) -> None | dict:
+        return self.raw["data"].get("resolved", None)
+
+    @property
+    def component_type(self) -> None | int:
+        return self.raw["data"].get("component_type", None)
+
+    @property
+    def custom_id(self) -> None | str:
+        return self.raw["data"].get("custom_id", None)
+
+    @property
+    def values(self) -> list:
+        return self.raw["data"].get("values", [])
+
+    @property
+    def command_name(self) -> str:
+        return self.raw["data"].get("name", None)
+
+    @property
+    def modal_values(self) -> None | list[dict]:
+        if self.raw["type"] == utils.InteractionTypes.MODAL_SUBMIT:
+            return self.raw["data"]["components"][0]["components"]
+        return None
+
+    @property
+    def member(self) -> None | Member:
+        if self._member is _MISSING:
+            self._member = (
+                Member(self.raw["member"]) if "member" in self.raw else None
+            )  # None in DMs
+        return self._member
+
+    @property
+    def invoked_by(self) -> None | User:
+        if self._invoked_by is _MISSING:
+            if self.raw["type"] == utils.InteractionTypes.MESSAGE_COMPONENT:
+                message = self.raw["message"]
+                self._invoked_by = (
+                    User(message["interaction"]["user"])
+                    if "interaction" in message
+                    else None
+                )
             else:
-                self.used_by: None | User = User(received["user"])
-
-        elif (
-            self.interaction_type == utils.InteractionTypes.MODAL_SUBMIT
-        ):  # modal submit
-            self.modal_values: None | list[dict] = self.data["components"][0][
-                "components"
-            ]
+                self._invoked_by = self.__author()
+        return self._invoked_by
+
+    @property
+    def used_by(self) -> None | User:
+        if self._used_by is _MISSING:
+            self._used_by = (
+                self.__author()
+                if self.raw["type"] == utils.InteractionTypes.MESSAGE_COMPONENT
+                else None
+            )
+        return self._used_by
+
+    @property
+    def user_id(self) -> int:
+        """The id of the user who sent this interaction, for components the one who
+        clicked rather than the author of the original command."""
+        author = self.raw["member"]["user"] if "member" in self.raw else self.raw["user"]
+        return int(author["id"])
+
+    def __author(self) -> User:
+        if "member" in self.raw:  # Not a DM interaction
+            return User(self.raw["member"]["user"])
+        return User(self.raw["user"])
 
     def check_user(self) -> bool:
         """
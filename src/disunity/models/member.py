@@ -3,17 +3,49 @@ from .user import User
 
 
 class Member:
+    __slots__ = ("raw", "_user")
+
     def __init__(self, received: dict):
         self.raw: dict = received
-        self.deaf: bool = received["deaf"]
-        self.pending: bool = received.get("pending", False)
-        self.joined_at = received["joined_at"]
-        self.mute: bool = received["mute"]
-        self.nick: str = received["nick"]
-        self.permissions: int = int(received.get("permissions", 0))
-        self.roles: list[int] = [int(role) for role in received["roles"]]
-        self.user: User = User(received["user"])
-        self.flags: int = int(received["flags"])
+        self._user: None | User = None
+
+    @property
+    def deaf(self) -> bool:
+        return self.raw["deaf"]
+
+    @property
+    def pending(self) -> bool:
+        return self.raw.get("pending", False)
+
+    @property
+    def joined_at(self):
+        return self.raw["joined_at"]
+
+    @property
+    def mute(self) -> bool:
+        return self.raw["mute"]
+
+    @property
+    def nick(self) -> str:
+        return self.raw["nick"]
+
+    @property
+    def permissions(self) -> int:
+        return int(self.raw.get("permissions", 0))
+
+    @property
+    def roles(self) -> list[int]:
+        return [int(role) for role in self.raw["roles"]]
+
+    @property
+    def user(self) -> User:
+        if self._user is None:
+            self._user = User(self.raw["user"])
+        return self._user
+
+    @property
+    def flags(self) -> int:
+        return int(self.raw["flags"])
 
     @property
     def server_avatar_url(self) -> None | str:
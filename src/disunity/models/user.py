@@ -2,14 +2,34 @@ from .. import utils
 
 
 class User:
+    __slots__ = ("raw",)
+
     def __init__(self, received):
         self.raw: dict = received
-        self.id: int = int(received["id"])
-        self.name: str = received["username"]
-        self.global_name: str = received["global_name"]
-        self.discriminator: int = int(received["discriminator"])
-        self.avatar_decoration: str = received.get("avatar_decoration", "")
-        self.public_flags: int = int(received.get("public_flags", 0))
+
+    @property
+    def id(self) -> int:
+        return int(self.raw["id"])
+
+    @property
+    def name(self) -> str:
+        return self.raw["username"]
+
+    @property
+    def global_name(self) -> str:
+        return self.raw["global_name"]
+
+    @property
+    def discriminator(self) -> int:
+        return int(self.raw["discriminator"])
+
+    @property
+    def avatar_decoration(self) -> str:
+        return self.raw.get("avatar_decoration", "")
+
+    @property
+    def public_flags(self) -> int:
+        return int(self.raw.get("public_flags", 0))
 
     @property
     def avatar_url(self) -> str:
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import inspect
+from typing import Callable
 
+from .autocomplete import ChoiceIndex
 from .identifiers import Autocomplete, Command, Component, SubOption, TopLevelSubCommand
+from .limits import ConcurrencyLimit, Cooldown
 
 
 class Package:
@@ -12,7 +15,15 @@ class Package:
 
     @classmethod
     def command(
-        cls, name: str, requires_ack: bool = False, requires_ephemeral: bool = False
+        cls,
+        name: str,
+        requires_ack: bool = False,
+        requires_ephemeral: bool = False,
+        auto_defer: bool | float = False,
+        time_limit: None | float = None,
+        fallback: None | dict = None,
+        cooldown: None | Cooldown = None,
+        max_concurrency: None | ConcurrencyLimit = None,
     ):
         """
         Declare a command within the application.
@@ -25,8 +36,29 @@ class Package:
             Does the command need to be acked before the first response.
             Defaulted to False.
         requires_ephemeral : bool
-            Only applicable if requires_ack is True. Acks the command
-            using an ephemeral response. Default to False.
+            Only applicable if requires_ack or auto_defer is True. Acks the
+            command using an ephemeral response. Default to False.
+        auto_defer : bool | float
+            Run the command inline, but defer the response if it has not
+            answered within this many seconds, True for the server's
+            AUTO_DEFER_BUDGET. The value returned by ctx.callback is then
+            sent by editing the original response. Default to False.
+        time_limit : float | None
+            Seconds the command may run before it is cancelled. None uses
+            the server's HANDLER_TIME_LIMIT, 0 disables the limit.
+            Default to None.
+        fallback : dict | None
+            Interaction response sent when the command is cancelled. Sent
+            after deferring if the command was acked. Default to None.
+        cooldown : Cooldown | None
+            Limits how often the command runs per user, guild, channel or
+            globally. Checked before the global check, throttled uses get
+            an ephemeral message. Default to None.
+        max_concurrency : ConcurrencyLimit | None
+            Limits how many interactions run the command at once, per user,
+            guild, channel or globally. Interactions over the limit are
+            rejected with an ephemeral message, or deferred until a slot
+            frees up. Default to None.
         """
 
         def decorator(coroutine):
@@ -42,7 +74,16 @@ class Package:
             actual.__component__ = False
             actual.__subcommand__ = False
             actual.__autocomplete__ = False
-            actual.__data__ = (name, requires_ack, requires_ephemeral)
+            actual.__data__ = (
+                name,
+                requires_ack,
+                requires_ephemeral,
+                auto_defer,
+                time_limit,
+                fallback,
+                cooldown,
+                max_concurrency,
+            )
 
             return actual
 
@@ -55,6 +96,14 @@ class Package:
         requires_ack: bool = False,
         requires_ephemeral: bool = False,
         timeout: float = 0.0,
+        args: None | tuple[type, ...] = None,
+        auto_defer: bool | float = False,
+        time_limit: None | float = None,
+        fallback: None | dict = None,
+        cooldown: None | Cooldown = None,
+        max_concurrency: None | ConcurrencyLimit = None,
+        serialize: None | str | Callable = None,
+        state: bool = False,
     ):
         """ "
         Declares a component object within the application
@@ -64,15 +113,59 @@ class Package:
         name : str
             The name of the component. Will be gathered in the format
             component_name-<unique tag for this component, preferably
-            the interaction id>.
+            the interaction id>, or from a custom_id built with
+            disunity.custom_id.encode. The name-suffix format is split on
+            the first '-', so names containing '-' only work with
+            custom_ids built by encode.
         requires_ack : bool
             Does the interaction need to be acked before the first response
             Default to False.
         requires_ephemeral : bool
-            Only applicable if requires_ack is True. Acks the interaction
-            using an ephemeral response.
+            Only applicable if requires_ack or auto_defer is True. Acks the
+            interaction using an ephemeral response.
         timeout : float
-            The component timeout. Default to 0.0.
+            Seconds after the message was sent that the component times out.
+            The server then disables it on the message, or removes it if
+            component_expiry.mode is 'remove'. Default to 0.0, no timeout.
+        args : tuple[type] | None
+            Types of the arguments packed into the custom_id with
+            disunity.custom_id.encode. When given, the decoded arguments
+            are passed to the method after the context.
+        auto_defer : bool | float
+            Defer the response if the component has not answered within
+            this many seconds, True for the server's AUTO_DEFER_BUDGET.
+            An UPDATE_MESSAGE callback then edits the message, a new
+            message is sent as a followup. Default to False.
+        time_limit : float | None
+            Seconds the method may run before it is cancelled, unlike
+            timeout which is measured from when the message was sent. See
+            Package.command. Default to None.
+        fallback : dict | None
+            Interaction response sent when the method is cancelled.
+            Default to None.
+        cooldown : Cooldown | None
+            See Package.command. Default to None.
+        max_concurrency : ConcurrencyLimit | None
+            See Package.command. Modal submits are never queued, they
+            are rejected when no slot is free. Default to None.
+        serialize : str | Callable | None
+            Run interactions one at a time, in order, per 'message' or
+            'user', or per key returned by a function taking the context.
+            The key is shared with every component serialized the same
+            way, so buttons of one message do not race. Default to None.
+        state : bool
+            Load the state stored with ctx.stateful_custom_id into
+            ctx.state. It is None once expired, after the component's
+            timeout or the server's COMPONENT_STATE_TTL. Default to False.
+
+        Example
+        -------
+        @Package.component("page", args=(int, int))
+
+        async def page(self, ctx: Context, owner_id: int, page: int):
+            ...
+
+        Button(custom_id.encode("page", ctx.invoked_by.id, 2), "Next")
         """
 
         def decorator(coroutine):
@@ -88,7 +181,20 @@ class Package:
             actual.__component__ = True
             actual.__subcommand__ = False
             actual.__autocomplete__ = False
-            actual.__data__ = (name, requires_ack, requires_ephemeral, timeout)
+            actual.__data__ = (
+                name,
+                requires_ack,
+                requires_ephemeral,
+                timeout,
+                args,
+                auto_defer,
+                time_limit,
+                fallback,
+                cooldown,
+                max_concurrency,
+                serialize,
+                state,
+            )
 
             return actual
 
@@ -100,6 +206,11 @@ class Package:
         name: str,
         sub_commands: list[str | SubOption] | str | SubOption,
         group: None | str = None,
+        auto_defer: bool | float = False,
+        time_limit: None | float = None,
+        fallback: None | dict = None,
+        cooldown: None | Cooldown = None,
+        max_concurrency: None | ConcurrencyLimit = None,
     ):
         """
         Declares a sub command within the application
@@ -112,6 +223,19 @@ class Package:
             The sub command options that this command has.
         group : str | None
             The group that the sub commands belong to. Defaults to None.
+        auto_defer : bool | float
+            See Package.command. Applies to every sub command that does not
+            set its own in SubOption. Defaults to False.
+        time_limit : float | None
+            See Package.command. Defaults to None.
+        fallback : dict | None
+            See Package.command. Defaults to None.
+        cooldown : Cooldown | None
+            See Package.command. The limit is shared by the sub commands.
+            Defaults to None.
+        max_concurrency : ConcurrencyLimit | None
+            See Package.command. The limit is shared by the sub commands.
+            Defaults to None.
         """
 
         def decorator(coroutine):
@@ -126,14 +250,32 @@ class Package:
             actual.__component__ = False
             actual.__subcommand__ = True
             actual.__autocomplete__ = False
-            actual.__data__ = (name, sub_commands, group)
+            actual.__data__ = (
+                name,
+                sub_commands,
+                group,
+                auto_defer,
+                time_limit,
+                fallback,
+                cooldown,
+                max_concurrency,
+            )
 
             return actual
 
         return decorator
 
     @classmethod
-    def autocomplete(cls, command_name: str):
+    def autocomplete(
+        cls,
+        command_name: str,
+        time_limit: None | float = None,
+        fallback: None | list[dict] = None,
+        cache_ttl: float = 0.0,
+        cache_match: None | str = "prefix",
+        index: None | dict[str, ChoiceIndex] = None,
+        supersede: bool = False,
+    ):
         """
         Declares a autocomplete function for a command
 
@@ -143,6 +285,29 @@ class Package:
         ----------
         command_name : str
             Name of the command this autocomplete belongs to
+        time_limit : float | None
+            Seconds the function may run before it is cancelled. None uses
+            the server's HANDLER_TIME_LIMIT, 0 disables the limit.
+        fallback : list[dict] | None
+            Choices returned when the function is cancelled. No choices
+            are returned by default.
+        cache_ttl : float
+            Seconds the choices returned for an option and typed text are
+            reused for. 0 disables caching. Default to 0.0.
+        cache_match : str | None
+            How the function matches choice names against the typed text,
+            'prefix' or 'contains', ignoring case. Lets a cached result be
+            filtered to answer longer text. None only reuses exact repeats.
+            Default to 'prefix'.
+        index : dict[str, ChoiceIndex] | None
+            Static choice sets searched by prefix, keyed on option name,
+            prefixed with the group and sub command names for options of
+            sub commands, for example 'delete name' or 'roles add role'.
+            Options found here are answered without calling the function.
+        supersede : bool
+            Cancel the function when the same user sends a newer request
+            for the same option, the older request then gets no choices.
+            Default to False.
 
         Example
         -------
@@ -170,7 +335,15 @@ class Package:
             actual.__component__ = False
             actual.__subcommand__ = False
             actual.__autocomplete__ = True
-            actual.__data__ = (command_name,)
+            actual.__data__ = (
+                command_name,
+                time_limit,
+                fallback,
+                cache_ttl,
+                cache_match,
+                index,
+                supersede,
+            )
 
             return actual
 
@@ -188,16 +361,16 @@ class Package:
                 d = meth.__data__
 
                 if meth.__command__:
-                    to_return.append(Command(d[0], meth, d[1], d[2]))
+                    to_return.append(Command(d[0], meth, *d[1:]))
 
                 elif meth.__component__:
-                    to_return.append(Component(d[0], meth, d[1], d[2], d[3]))
+                    to_return.append(Component(d[0], meth, *d[1:]))
 
                 elif meth.__subcommand__:
-                    to_return.append(TopLevelSubCommand(d[0], meth, d[1], d[2]))
+                    to_return.append(TopLevelSubCommand(d[0], meth, *d[1:]))
 
                 elif meth.__autocomplete__:
-                    to_return.append(Autocomplete(d[0], meth))
+                    to_return.append(Autocomplete(d[0], meth, *d[1:]))
 
             except AttributeError:
                 continue
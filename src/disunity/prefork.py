@@ -0,0 +1,186 @@
+"""
+Pre-forked multi-process serving
+
+The parent process loads the application, binds the address once to surface errors
+early, then forks the workers. Each worker listens on its own socket bound to the same
+address with SO_REUSEPORT, so the kernel spreads connections between them, and runs
+its own event loop, on uvloop when it is installed. The parent only supervises: it
+restarts workers that exit unexpectedly and forwards SIGINT and SIGTERM so workers
+shut down gracefully.
+
+Where SO_REUSEPORT is missing the workers share the parent's listening socket instead.
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+import traceback
+from typing import Callable
+
+REUSE_PORT = hasattr(socket, "SO_REUSEPORT")
+
+
+def bind(host: str, port: int, reuse_port: bool = REUSE_PORT) -> socket.socket:
+    """A TCP socket bound to the address, non blocking and inheritable."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind((host, port))
+    sock.setblocking(False)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(
+    app,
+    sock: socket.socket,
+    backlog: int = 1024,
+    use_uvloop: bool = True,
+    certfile: None | str = None,
+    keyfile: None | str = None,
+):
+    """
+    Serves the application on a bound socket until SIGINT or SIGTERM
+
+    The application's before and after serving hooks run in this process, so every
+    worker opens its own client session and background tasks.
+    """
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    if use_uvloop:
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    config = Config()
+    config.bind = [f"fd://{sock.fileno()}"]
+    config.backlog = backlog
+    config.certfile = certfile
+    config.keyfile = keyfile
+    config.errorlog = "-"
+    asyncio.run(serve(app, config))
+
+
+class Supervisor:
+    """
+    Forks the workers and keeps them running
+
+    A worker that exits while the supervisor is not stopping is replaced. Workers that
+    die within `min_uptime` of starting are replaced after a backoff doubling up to
+    `max_delay`, so a worker that can not start does not fork in a tight loop.
+
+    Parameters
+    ----------
+    target: Callable[[int], None]
+        Runs a worker, given its index. Returning exits the worker cleanly.
+    workers: int
+        Number of worker processes.
+    logger: Optional[logging.Logger]
+        Where restarts are logged. Defaults to the 'disunity' logger.
+    min_uptime: float
+        Seconds a worker must run for to be considered started. Defaults to 1.
+    max_delay: float
+        Longest backoff before a restart. Defaults to 30.
+    """
+
+    def __init__(
+        self,
+        target: Callable[[int], None],
+        workers: int,
+        logger: None | logging.Logger = None,
+        min_uptime: float = 1.0,
+        max_delay: float = 30.0,
+    ):
+        self.target: Callable[[int], None] = target
+        self.workers: int = workers
+        self.logger: logging.Logger = logger or logging.getLogger("disunity")
+        self.min_uptime: float = min_uptime
+        self.max_delay: float = max_delay
+        self.restarts: int = 0
+        self.__children: dict[int, tuple[int, float]] = {}  # pid -> (index, started)
+        self.__stopping: bool = False
+        self.__delay: float = 0.0
+
+    @property
+    def pids(self) -> list[int]:
+        return list(self.__children)
+
+    def __spawn(self, index: int):
+        pid = os.fork()
+        if pid:
+            self.__children[pid] = (index, time.monotonic())
+            return
+
+        code = 1
+        try:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, signal.SIG_DFL)
+            self.target(index)
+            code = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(code)
+
+    def __stop(self, signum, frame):
+        self.__stopping = True
+        for pid in list(self.__children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        """Runs until every worker exited after a stop signal."""
+        previous = {
+            signum: signal.signal(signum, self.__stop)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        # objects created so far are shared with the workers, untracking them keeps
+        # the garbage collector from writing to, and so copying, their pages
+        gc.collect()
+        gc.freeze()
+        try:
+            for index in range(self.workers):
+                self.__spawn(index)
+
+            while self.__children:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                index, started = self.__children.pop(pid)
+                if self.__stopping:
+                    continue
+
+                self.logger.warning(
+                    "Worker %d (pid %d) exited with %d, restarting",
+                    index,
+                    pid,
+                    os.waitstatus_to_exitcode(status),
+                )
+                if time.monotonic() - started < self.min_uptime:
+                    self.__delay = min(max(self.__delay * 2, 0.1), self.max_delay)
+                    resume = time.monotonic() + self.__delay
+                    while not self.__stopping and time.monotonic() < resume:
+                        time.sleep(0.1)  # a stop signal ends the backoff early
+                else:
+                    self.__delay = 0.0
+                if not self.__stopping:
+                    self.restarts += 1
+                    self.__spawn(index)
+        finally:
+            gc.unfreeze()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Mapping
+
+if TYPE_CHECKING:
+    import aiohttp  # imported on the first outbound request
+
+MAJOR_PARAMETERS = ("channels", "guilds", "webhooks", "interactions")
+TOKEN_PARAMETERS = ("webhooks", "interactions")
+GLOBAL_EXEMPT = ("interactions", "webhooks")
+
+
+def route_key(method: str, route: str) -> tuple[str, str]:
+    """
+    Splits a relative route into its rate limit key and major parameter
+
+    Snowflakes are replaced by placeholders so every message of a channel shares the
+    same key, while the first channel, guild, webhook or interaction id (with its token)
+    is kept as the major parameter.
+
+    Example
+    -------
+    route_key("PATCH", "webhooks/1/abc/messages/2")
+    >>> ("PATCH webhooks/{major}/{token}/messages/{id}", "1/abc")
+    """
+    segments = route.split("?", 1)[0].strip("/").split("/")
+    template = []
+    major = ""
+    index = 0
+
+    while index < len(segments):
+        segment = segments[index]
+        previous = segments[index - 1] if index else None
+
+        if not major and previous in MAJOR_PARAMETERS:
+            major = segment
+            template.append("{major}")
+            if previous in TOKEN_PARAMETERS and index + 1 < len(segments):
+                index += 1
+                major += "/" + segments[index]
+                template.append("{token}")
+        elif segment.isdigit():
+            template.append("{id}")
+        else:
+            template.append(segment)
+        index += 1
+
+    return method.upper() + " " + "/".join(template), major
+
+
+class Bucket:
+    """
+    State of a single Discord rate limit bucket
+
+    Requests are let through while the bucket has remaining uses. Once exhausted,
+    further requests wait for the reset instead of failing.
+    """
+
+    def __init__(self, key: tuple[str, str]):
+        self.key: tuple[str, str] = key
+        self.limit: int = 1
+        self.remaining: int = 1
+        self.reset_at: float = 0.0  # 0 means the current window is unknown
+        self.queued: int = 0
+        self.inflight: int = 0
+
+        self.requests: int = 0
+        self.delayed: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+        self.__updated: asyncio.Event = asyncio.Event()
+
+    @property
+    def idle(self) -> bool:
+        return (
+            self.queued == 0
+            and self.inflight == 0
+            and self.reset_at <= time.monotonic()
+        )
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_after": max(self.reset_at - time.monotonic(), 0.0),
+            "queued": self.queued,
+            "inflight": self.inflight,
+            "requests": self.requests,
+            "delayed": self.delayed,
+            "average_wait": self.total_wait / self.delayed if self.delayed else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+    def __notify(self):
+        self.__updated.set()
+        self.__updated = asyncio.Event()
+
+    async def acquire(self):
+        started = now = time.monotonic()
+        self.queued += 1
+        try:
+            while True:
+                if self.reset_at and self.reset_at <= now:
+                    self.remaining = self.limit
+                    self.reset_at = 0.0
+
+                if self.remaining > 0:
+                    self.remaining -= 1
+                    self.inflight += 1
+                    break
+
+                if self.reset_at:
+                    timeout = self.reset_at - now
+                elif self.inflight:
+                    timeout = None  # an in-flight response will tell us the window
+                else:
+                    self.remaining = 1
+                    continue
+
+                try:
+                    await asyncio.wait_for(self.__updated.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                now = time.monotonic()
+        finally:
+            self.queued -= 1
+
+        self.requests += 1
+        if now != started:
+            waited = now - started
+            self.delayed += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def update(self, headers: None | Mapping = None):
+        """Releases a use of the bucket, learning the window from response headers."""
+        self.inflight -= 1
+        now = time.monotonic()
+
+        if headers is not None and "X-RateLimit-Remaining" in headers:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            if self.reset_at > now:
+                self.remaining = min(self.remaining, remaining)
+            else:
+                self.remaining = max(remaining - self.inflight, 0)
+            self.limit = int(headers.get("X-RateLimit-Limit", self.limit))
+            self.reset_at = now + float(headers.get("X-RateLimit-Reset-After", 0))
+
+        elif not self.reset_at:
+            self.remaining += 1  # route without limits, give the probe back
+
+        self.__notify()
+
+    def block(self, retry_after: float):
+        self.remaining = 0
+        self.reset_at = max(self.reset_at, time.monotonic() + retry_after)
+        self.__notify()
+
+
+class GlobalLimit:
+    """Token bucket enforcing the global requests per second limit."""
+
+    def __init__(self, rate: int):
+        self.rate: int = rate
+        self.tokens: float = rate
+        self.updated: float = time.monotonic()
+        self.blocked_until: float = 0.0
+
+        self.delayed: int = 0
+        self.total_wait: float = 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "tokens": self.tokens,
+            "blocked_for": max(self.blocked_until - time.monotonic(), 0.0),
+            "delayed": self.delayed,
+            "average_wait": self.total_wait / self.delayed if self.delayed else 0.0,
+        }
+
+    async def acquire(self):
+        started = now = time.monotonic()
+        while True:
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+            else:
+                self.tokens = min(
+                    self.rate, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+            now = time.monotonic()
+
+        if now != started:
+            self.delayed += 1
+            self.total_wait += now - started
+
+    def block(self, retry_after: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+class RateLimiter:
+    """
+    Schedules outbound requests according to Discord's rate limits
+
+    Buckets are learned from the X-RateLimit-Bucket header of each route and keyed on
+    their major parameter. Requests over the limit are queued until the bucket resets,
+    and 429 responses are retried after the time Discord asks for.
+
+    Parameters
+    ----------
+    global_limit: int
+        Requests per second allowed across all non interaction routes. Defaults to 50.
+    max_retries: int
+        How many times a request rejected with 429 is retried. Defaults to 5.
+    sweep_every: int
+        Idle buckets are evicted after this many new buckets are created, keeping
+        memory bounded with per interaction webhook buckets. Defaults to 1024.
+    """
+
+    def __init__(
+        self, global_limit: int = 50, max_retries: int = 5, sweep_every: int = 1024
+    ):
+        self.max_retries: int = max_retries
+        self.sweep_every: int = sweep_every
+        self.rejected: int = 0
+        self.__global: GlobalLimit = GlobalLimit(global_limit)
+        self.__hashes: dict[str, str] = {}
+        self.__buckets: dict[tuple[str, str], Bucket] = {}
+        self.__created: int = 0
+
+    @property
+    def global_limit(self) -> GlobalLimit:
+        return self.__global
+
+    @property
+    def stats(self) -> dict:
+        """Per bucket queue depth, usage and wait time, plus the global limit state."""
+        return {
+            "global": self.__global.stats,
+            "rejected": self.rejected,
+            "buckets": {
+                f"{key[0]}:{key[1]}": bucket.stats
+                for key, bucket in self.__buckets.items()
+            },
+        }
+
+    def get_bucket(self, method: str, route: str) -> Bucket:
+        key, major = route_key(method, route)
+        return self.__bucket((self.__hashes.get(key, key), major))
+
+    def __bucket(self, key: tuple[str, str]) -> Bucket:
+        bucket = self.__buckets.get(key, None)
+        if bucket is None:
+            self.__created += 1
+            if self.__created % self.sweep_every == 0:
+                self.sweep()
+            bucket = self.__buckets[key] = Bucket(key)
+        return bucket
+
+    def sweep(self):
+        """Evicts buckets with nothing queued or in flight whose window has passed."""
+        for key in [key for key, bucket in self.__buckets.items() if bucket.idle]:
+            del self.__buckets[key]
+
+    def __learn(self, key: str, major: str, bucket: Bucket, headers: Mapping):
+        bucket_hash = headers.get("X-RateLimit-Bucket", None)
+        if bucket_hash is None or self.__hashes.get(key, None) == bucket_hash:
+            return
+
+        self.__hashes[key] = bucket_hash
+        if (bucket_hash, major) not in self.__buckets:
+            # Adopt the provisional bucket so its waiters keep their place
+            self.__buckets.pop(bucket.key, None)
+            bucket.key = (bucket_hash, major)
+            self.__buckets[bucket.key] = bucket
+
+    async def perform(
+        self,
+        method: str,
+        route: str,
+        send: Callable[[], Awaitable[aiohttp.ClientResponse]],
+    ) -> aiohttp.ClientResponse:
+        """
+        Performs `send` once the route's bucket and the global limit allow it
+
+        Parameters
+        ----------
+        method: str
+            The HTTP method of the request.
+        route: str
+            The route relative to the API base url.
+        send: Callable
+            Coroutine function performing the request, called once per attempt.
+        """
+        key, major = route_key(method, route)
+        exempt = key.split(" ", 1)[1].startswith(GLOBAL_EXEMPT)
+
+        for _ in range(self.max_retries + 1):
+            bucket = self.__bucket((self.__hashes.get(key, key), major))
+            if not exempt:
+                await self.__global.acquire()
+            await bucket.acquire()
+
+            try:
+                response = await send()
+            except BaseException:
+                bucket.update()
+                raise
+
+            self.__learn(key, major, bucket, response.headers)
+            bucket.update(response.headers)
+            if response.status != 429:
+                return response
+
+            self.rejected += 1
+            try:
+                body = await response.json()
+            except Exception:
+                body = {}
+
+            retry_after = float(
+                body.get("retry_after", response.headers.get("Retry-After", 1))
+            )
+            if body.get("global", False) or "X-RateLimit-Global" in response.headers:
+                self.__global.block(retry_after)
+            else:
+                bucket.block(retry_after)
+
+        return response
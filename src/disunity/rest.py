@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING
+
+from . import retry
+from .codec import JSONCodec
+from .ratelimit import RateLimiter
+from .retry import CircuitBreaker, RetryPolicy
+
+if TYPE_CHECKING:
+    import aiohttp  # imported on the first outbound request
+
+DISCORD_API_BASE = "https://discord.com/api/v10/"
+# interaction callbacks and followups authenticate with the interaction token and keep
+# working while other routes fail, so they never trip or wait on the circuit breaker
+BREAKER_EXEMPT = ("interactions", "webhooks")
+
+
+class RESTClient:
+    """
+    Pooled HTTP client used for every outbound request made by the server
+
+    Parameters
+    ----------
+    base_url: str
+        The url that relative routes are joined to. Defaults to the Discord v10 API,
+        can be pointed at a local stand-in for benchmarks.
+    session: Optional[aiohttp.ClientSession]
+        An externally managed session to use. When given, the client will never
+        close it.
+    limit: int
+        Total number of simultaneous connections the connector may hold open.
+    limit_per_host: int
+        Number of simultaneous connections per host. 0 means no per host limit.
+    keepalive_timeout: float
+        Seconds an idle connection is kept in the pool before being closed.
+    dns_cache_ttl: int
+        Seconds resolved addresses are cached for.
+    ratelimiter: Optional[RateLimiter]
+        Scheduler for requests made to routes relative to the base url. A default one is
+        created when not given, pass False to disable rate limit handling.
+    retry_policy: Optional[RetryPolicy]
+        How requests failing with a 5xx status or a connection error are retried. A
+        default one is created when not given, pass False to disable retries.
+    breaker: Optional[CircuitBreaker]
+        Circuit breaker for requests made to routes relative to the base url, except
+        interaction and webhook routes. A default one is created when not given, pass
+        False to disable it.
+    codec: Optional[JSONCodec]
+        Codec used to encode payloads. Defaults to the standard library codec.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DISCORD_API_BASE,
+        session: None | aiohttp.ClientSession = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        ratelimiter: None | bool | RateLimiter = None,
+        retry_policy: None | bool | RetryPolicy = None,
+        breaker: None | bool | CircuitBreaker = None,
+        codec: None | JSONCodec = None,
+    ):
+        if not base_url.endswith("/"):
+            base_url += "/"
+
+        self.base_url: str = base_url
+        self.limit: int = limit
+        self.limit_per_host: int = limit_per_host
+        self.keepalive_timeout: float = keepalive_timeout
+        self.dns_cache_ttl: int = dns_cache_ttl
+        self.ratelimiter: None | RateLimiter = (
+            RateLimiter() if ratelimiter is None else ratelimiter or None
+        )
+        self.retry_policy: None | RetryPolicy = (
+            RetryPolicy() if retry_policy is None else retry_policy or None
+        )
+        self.breaker: None | CircuitBreaker = (
+            CircuitBreaker() if breaker is None else breaker or None
+        )
+        self.codec: JSONCodec = codec or JSONCodec()
+        self.__session: None | aiohttp.ClientSession = session
+        self.__owns_session: bool = session is None
+
+    @property
+    def session(self) -> None | aiohttp.ClientSession:
+        return self.__session
+
+    @property
+    def closed(self) -> bool:
+        return self.__session is None or self.__session.closed
+
+    def url(self, route: str) -> str:
+        if route.startswith(("https://", "http://")):
+            return route
+        return self.base_url + route.lstrip("/")
+
+    async def open(self) -> aiohttp.ClientSession:
+        """Creates the pooled session if it does not exist yet."""
+        if self.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self.__session = aiohttp.ClientSession(connector=connector)
+            self.__owns_session = True
+        return self.__session
+
+    async def close(self):
+        """Closes the pooled session. Injected sessions are left untouched."""
+        if self.__owns_session and not self.closed:
+            await self.__session.close()
+        if self.__owns_session:
+            self.__session = None
+
+    def build_body(
+        self,
+        headers: None | dict = None,
+        payload: None | dict = None,
+        files: None | list = None,
+    ) -> dict:
+        """Builds the request keyword arguments for a json payload and attached files."""
+        if not files:
+            if not payload:
+                return {"headers": headers}
+            return {
+                "headers": {**(headers or {}), "Content-Type": "application/json"},
+                "data": self.codec.dumps(payload),
+            }
+
+        import mimetypes
+
+        import aiohttp
+
+        data = aiohttp.FormData()
+        if payload:
+            data.add_field(
+                "payload_json",
+                self.codec.dumps(payload).decode(),  # bytes would be sent as a file
+                content_type="application/json",
+            )
+        for file in files:
+            content_type, _ = mimetypes.guess_type(file["filename"])
+            if content_type is None:
+                content_type = "application/octet-stream"
+            data.add_field(
+                f"files[{file['id']}]",
+                file["content"],
+                filename=file["filename"],
+                content_type=content_type,
+            )
+        return {"headers": headers, "data": data}
+
+    async def decode(self, response: aiohttp.ClientResponse):
+        """Decodes the JSON body of a response returned by `request` with the codec."""
+        return await response.json(loads=self.codec.loads, content_type=None)
+
+    async def request(
+        self,
+        method: str,
+        route: str,
+        headers: None | dict = None,
+        payload: None | dict = None,
+        files: None | list = None,
+        **kwargs,
+    ) -> aiohttp.ClientResponse:
+        """
+        Performs a request using the pooled session
+
+        Requests to the base url go through the circuit breaker and rate limiter, and
+        idempotent requests may be retried, so the body is rebuilt from `payload` and
+        `files` for every attempt. The response body is read before the connection is
+        handed back to the pool, so the returned response can still be read from
+        afterwards.
+        """
+
+        async def send() -> aiohttp.ClientResponse:
+            session = self.__session if not self.closed else await self.open()
+            async with session.request(
+                method,
+                self.url(route),
+                **self.build_body(headers, payload, files),
+                **kwargs,
+            ) as response:
+                await response.read()
+                return response
+
+        relative = route
+        if route.startswith(self.base_url):
+            relative = route[len(self.base_url) :]
+        elif route.startswith(("https://", "http://")):
+            return await retry.perform(method, send, self.retry_policy)
+
+        schedule = None
+        if self.ratelimiter is not None:
+            schedule = functools.partial(self.ratelimiter.perform, method, relative)
+
+        breaker = self.breaker
+        if relative.lstrip("/").split("/", 1)[0] in BREAKER_EXEMPT:
+            breaker = None
+        return await retry.perform(method, send, self.retry_policy, breaker, schedule)
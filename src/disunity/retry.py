@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from . import errors
+
+if TYPE_CHECKING:
+    import aiohttp  # imported on the first outbound request
+
+
+def retryable_exceptions() -> tuple[type[Exception], ...]:
+    import aiohttp
+
+    return (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+
+class RetryPolicy:
+    """
+    Decides how failed outbound requests are retried
+
+    Parameters
+    ----------
+    max_attempts: int
+        Total number of attempts for a request, including the first. Defaults to 3.
+    methods: tuple[str]
+        Methods that are safe to send again. POST is left out since followups are
+        not idempotent.
+    statuses: tuple[int]
+        Response statuses that are retried. Defaults to 500, 502, 503 and 504.
+    base_delay: float
+        Backoff before the first retry, doubled for every following one.
+    max_delay: float
+        Upper bound for a single backoff.
+    deadline: float
+        Seconds a request may take across all of its attempts and backoffs. Time
+        queued behind the rate limiter does not count.
+    jitter: bool
+        Picks a random backoff between 0 and the computed delay, so retries from many
+        handlers do not arrive at Discord at the same time. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        methods: tuple[str, ...] = ("DELETE", "GET", "PATCH", "PUT"),
+        statuses: tuple[int, ...] = (500, 502, 503, 504),
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadline: float = 15.0,
+        jitter: bool = True,
+    ):
+        self.max_attempts: int = max_attempts
+        self.methods: tuple[str, ...] = methods
+        self.statuses: tuple[int, ...] = statuses
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.deadline: float = deadline
+        self.jitter: bool = jitter
+        self.retries: int = 0
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2**attempt)
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while Discord is degraded
+
+    After `failure_threshold` consecutive failures the circuit opens and requests are
+    rejected with CircuitOpenError for `reset_timeout` seconds. Then a single trial
+    request is let through, closing the circuit again if it succeeds.
+
+    Parameters
+    ----------
+    failure_threshold: int
+        Consecutive failures needed to open the circuit. Defaults to 5.
+    reset_timeout: float
+        Seconds the circuit stays open before a trial request. Defaults to 10.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.failures: int = 0
+        self.opened_at: float = 0.0
+        self.rejected: int = 0
+        self.__trial_at: float = 0.0
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+    def before_request(self):
+        state = self.state
+        if state == self.CLOSED:
+            return
+
+        now = time.monotonic()
+        if state == self.HALF_OPEN and now - self.__trial_at >= self.reset_timeout:
+            self.__trial_at = now  # a lost trial is replaced after reset_timeout
+            return
+
+        self.rejected += 1
+        raise errors.CircuitOpenError(
+            max(self.opened_at + self.reset_timeout - now, 0.0)
+        )
+
+    def record_success(self):
+        self.failures = 0
+        self.__trial_at = 0.0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.__trial_at = 0.0
+
+
+async def perform(
+    method: str,
+    send: Callable[[], Awaitable[aiohttp.ClientResponse]],
+    policy: None | RetryPolicy = None,
+    breaker: None | CircuitBreaker = None,
+    schedule: None
+    | Callable[
+        [Callable[[], Awaitable[aiohttp.ClientResponse]]],
+        Awaitable[aiohttp.ClientResponse],
+    ] = None,
+) -> aiohttp.ClientResponse:
+    """
+    Performs `send` under the given retry policy and circuit breaker
+
+    Only idempotent methods are retried. `schedule`, such as the rate limiter, is given
+    every attempt to run once its turn comes. The policy's deadline bounds the network
+    attempts and the backoff between them, not the time spent waiting in `schedule`,
+    and the breaker only counts failures of the network attempts themselves.
+    """
+    if policy is None:
+        attempts, budget = 1, None
+    else:
+        attempts = policy.max_attempts if method.upper() in policy.methods else 1
+        budget = policy.deadline
+    spent = 0.0
+
+    async def attempt() -> aiohttp.ClientResponse:
+        nonlocal spent
+        timeout = None if budget is None else budget - spent
+        if timeout is not None and timeout <= 0:
+            raise asyncio.TimeoutError  # the deadline ran out, not Discord
+
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(send(), timeout)
+        except retryable_exceptions():
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        finally:
+            spent += time.monotonic() - started
+
+        if breaker is not None:
+            if response.status >= 500 or (
+                policy is not None and response.status in policy.statuses
+            ):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+
+    for number in range(attempts):
+        if breaker is not None:
+            breaker.before_request()
+
+        retry = number < attempts - 1
+        if retry:
+            delay = policy.backoff(number)
+
+        try:
+            response = await (attempt() if schedule is None else schedule(attempt))
+        except retryable_exceptions():
+            if not retry or spent + delay >= budget:
+                raise
+        else:
+            failed = policy is not None and response.status in policy.statuses
+            if not failed or not retry or spent + delay >= budget:
+                return response
+
+        policy.retries += 1
+        await asyncio.sleep(delay)
+        spent += delay
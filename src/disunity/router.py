@@ -0,0 +1,187 @@
+from . import custom_id, errors
+from .identifiers import (
+    Autocomplete,
+    Command,
+    Component,
+    SubCommand,
+    TopLevelSubCommand,
+)
+from .utils import InteractionTypes
+
+SUB_COMMAND = 1
+SUB_COMMAND_GROUP = 2
+
+
+class PackageStub:
+    """
+    Placeholder for the routes of a package module that is not imported yet
+
+    Parameters
+    ----------
+    module: str
+        The module path the package is loaded from.
+    routes: dict
+        The module's routes, as described in its manifest.
+    """
+
+    def __init__(self, module: str, routes: dict):
+        self.module: str = module
+        self.commands: list[tuple[int, str, None | str, None | str]] = [
+            tuple(key) for key in routes.get("commands", [])
+        ]
+        self.components: list[str] = list(routes.get("components", []))
+        self.autocompletes: list[str] = list(routes.get("autocompletes", []))
+
+
+class Router:
+    """
+    Routing table compiled from registered packages
+
+    Commands are keyed on (interaction type, command name, group, sub command), so
+    resolving an interaction is a single dictionary lookup. Routes are changed on a
+    copy which then replaces the table in use, so lookups never see half a package.
+    """
+
+    def __init__(self):
+        self.commands: dict[
+            tuple[int, str, None | str, None | str], Command | SubCommand
+        ] = {}
+        self.components: dict[str, Component] = {}
+        self.autocompletes: dict[str, Autocomplete] = {}
+
+    def add_item(
+        self,
+        incoming: TopLevelSubCommand | Command | Component | Autocomplete | PackageStub,
+    ):
+        if isinstance(incoming, PackageStub):
+            for key in incoming.commands:
+                self.commands[key] = incoming
+            for name in incoming.components:
+                self.components[name] = incoming
+            for name in incoming.autocompletes:
+                self.autocompletes[name] = incoming
+
+        elif isinstance(incoming, TopLevelSubCommand):
+            for sub in incoming.sub_commands:
+                self.commands[
+                    (
+                        InteractionTypes.APPLICATION_COMMAND,
+                        incoming.name,
+                        incoming.group,
+                        sub.name,
+                    )
+                ] = sub
+
+        elif isinstance(incoming, Command):
+            self.commands[(incoming.command_type, incoming.name, None, None)] = incoming
+
+        elif isinstance(incoming, Component):
+            self.components[incoming.name] = incoming
+
+        elif isinstance(incoming, Autocomplete):
+            self.autocompletes[incoming.command_name] = incoming
+
+        else:
+            raise TypeError
+
+    def remove_item(
+        self,
+        outgoing: TopLevelSubCommand | Command | Component | Autocomplete | PackageStub,
+    ):
+        """Removes the routes of an item, unless another item has replaced them."""
+        if isinstance(outgoing, PackageStub):
+            for table, keys in (
+                (self.commands, outgoing.commands),
+                (self.components, outgoing.components),
+                (self.autocompletes, outgoing.autocompletes),
+            ):
+                for key in keys:
+                    if table.get(key, None) is outgoing:
+                        del table[key]
+
+        elif isinstance(outgoing, TopLevelSubCommand):
+            for sub in outgoing.sub_commands:
+                key = (
+                    InteractionTypes.APPLICATION_COMMAND,
+                    outgoing.name,
+                    outgoing.group,
+                    sub.name,
+                )
+                if self.commands.get(key, None) is sub:
+                    del self.commands[key]
+
+        elif isinstance(outgoing, Command):
+            key = (outgoing.command_type, outgoing.name, None, None)
+            if self.commands.get(key, None) is outgoing:
+                del self.commands[key]
+
+        elif isinstance(outgoing, Component):
+            if self.components.get(outgoing.name, None) is outgoing:
+                del self.components[outgoing.name]
+
+        elif isinstance(outgoing, Autocomplete):
+            if self.autocompletes.get(outgoing.command_name, None) is outgoing:
+                del self.autocompletes[outgoing.command_name]
+
+        else:
+            raise TypeError
+
+    def copy(self) -> "Router":
+        router = Router()
+        router.commands = dict(self.commands)
+        router.components = dict(self.components)
+        router.autocompletes = dict(self.autocompletes)
+        return router
+
+    def resolve_command(
+        self, interaction_type: int, data: dict
+    ) -> tuple[Command | SubCommand, list[dict]]:
+        """
+        Finds the handler of an application command
+
+        Returns the handler and the options meant for it, which for sub commands are
+        the options nested under the invoked sub command.
+        """
+        name = data["name"]
+        group = sub = None
+        options = data.get("options", [])
+
+        if options and options[0]["type"] == SUB_COMMAND_GROUP:
+            group = options[0]["name"]
+            options = options[0]["options"]
+
+        if options and options[0]["type"] == SUB_COMMAND:
+            sub = options[0]["name"]
+            options = options[0].get("options", [])
+
+        handler = self.commands.get((interaction_type, name, group, sub), None)
+        if handler is None:
+            if sub is not None and (interaction_type, name, None, None) in self.commands:
+                raise errors.InvalidMethodUse(
+                    "Commands with sub commands must be registered using the Package.sub decorator"
+                )
+            raise errors.CommandNotFound(name)
+
+        return handler, options
+
+    def resolve_component(self, maybe_custom_id: str) -> Component:
+        """
+        Finds the component a custom_id routes to
+
+        Custom ids built with custom_id.encode are looked up by their prefix, others
+        fall back to the name-suffix format, split on the first '-'. That makes names
+        containing '-' ambiguous there: 'a-b-1' routes to 'a', not to 'a-b'.
+        """
+        component = self.components.get(custom_id.prefix(maybe_custom_id), None)
+        if component is None:
+            name = maybe_custom_id.partition("-")[0]
+            component = self.components.get(name, None)
+            if component is None:
+                raise errors.ComponentNotFound(name)
+        return component
+
+    def resolve_autocomplete(self, command_name: str) -> Autocomplete:
+        autocomplete = self.autocompletes.get(command_name, None)
+        if autocomplete is None:
+            raise errors.AutocompleteNotFound(command_name)
+        return autocomplete
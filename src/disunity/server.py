@@ -1,20 +1,41 @@
+from __future__ import annotations
+
 import asyncio
 import importlib
-import json
-import mimetypes
+import os
+import sys
 import time
+from typing import TYPE_CHECKING, Awaitable
 
-import aiohttp
 import quart
-import requests
-from nacl.exceptions import BadSignatureError
-from nacl.signing import VerifyKey
-from quart.flask_patch.globals import request
-from quart.json import jsonify
+from quart import request
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 
-from . import cache, errors, identifiers, utils
+from . import (
+    auth,
+    autocomplete,
+    cache,
+    codec,
+    custom_id,
+    dedupe,
+    errors,
+    expiry,
+    identifiers,
+    limits,
+    manifest,
+    prefork,
+    rest,
+    router,
+    state,
+    tasks,
+    utils,
+    verification,
+)
 from .models.context import Context
 
+if TYPE_CHECKING:
+    import aiohttp  # imported on the first outbound request
+
 
 class DisunityServer(quart.Quart):
     """
@@ -32,6 +53,17 @@ class DisunityServer(quart.Quart):
     bot_token: Optional[str]
         The bot token tied to this application if applicable. Only pass in token if you expect
         to use any other part of the Discord API that is not interactions based.
+    http_session: Optional[aiohttp.ClientSession]
+        A session to use for outbound requests instead of the pooled one the server creates
+        on the first request. The server will not close an injected session.
+    api_base_url: str
+        The url relative request routes are joined to. Defaults to the Discord v10 API.
+    json_codec: Optional[str | codec.JSONCodec]
+        The JSON codec used for interactions, responses and outbound requests. Can be
+        'json', 'orjson', 'msgspec' or a codec instance. Defaults to the standard library.
+    state_store: Optional[state.StateStore]
+        Where component state is kept. Defaults to an in memory LRU, use
+        state.SQLiteStateStore to keep it across restarts.
     """
 
     def __init__(
@@ -40,23 +72,341 @@ class DisunityServer(quart.Quart):
         client_secret: str,
         client_id: int,
         bot_token: None | str = None,
+        http_session: None | aiohttp.ClientSession = None,
+        api_base_url: str = rest.DISCORD_API_BASE,
+        json_codec: None | str | codec.JSONCodec = None,
+        state_store: None | state.StateStore = None,
     ):
         super().__init__(__name__)
         self.config["CLIENT_PUBLIC_KEY"] = public_key
         self.config["CLIENT_SECRET"] = client_secret
         self.config["CLIENT_ID"] = client_id
         self.config["BOT_TOKEN"] = bot_token
-        self.config["CREDENTIALS_EXPIRE_IN"] = 0  # set on start up
+        self.config["AUTO_DEFER_BUDGET"] = 2.2  # seconds, Discord allows 3
+        self.config["HANDLER_TIME_LIMIT"] = 900.0  # interaction tokens last 15 minutes
+        self.config["DEDUPE_INTERACTIONS"] = False
+        self.config["COOLDOWN_MESSAGE"] = (
+            "You are doing that too fast, try again in {retry_after:.1f} seconds."
+        )
+        self.config["CONCURRENCY_MESSAGE"] = (
+            "Too many people are using this right now, try again later."
+        )
+        self.config["COMPONENT_STATE_TTL"] = 900.0  # for components without a timeout
         self.__cache: cache.ApplicationCache = cache.ApplicationCache()
+        self.__router: router.Router = router.Router()
+        self.__dispatch = {
+            utils.InteractionTypes.PING: self.__ping,
+            utils.InteractionTypes.APPLICATION_COMMAND: self.__application_command,
+            utils.InteractionTypes.MESSAGE_COMPONENT: self.__message_component,
+            utils.InteractionTypes.APPLICATION_COMMAND_AUTOCOMPLETE: self.__autocomplete,
+            utils.InteractionTypes.MODAL_SUBMIT: self.__modal_submit,
+        }
         self.__packages = dict()
-        self.__key = VerifyKey(bytes.fromhex(self.config["CLIENT_PUBLIC_KEY"]))
+        # module path -> names of the packages it registered, and their items
+        self.__modules: dict[str, tuple[list[str], list]] = {}
+        self.__loading: None | str = None
+        self.__staged: None | list = None
+        self.__imports: dict[str, asyncio.Future] = {}
+        self.__verifier: verification.SignatureVerifier = (
+            verification.SignatureVerifier(public_key)
+        )
+        self.__guard: verification.RequestGuard = verification.RequestGuard()
+        # streamed bodies without a Content-Length are cut off while they are read
+        self.config["MAX_CONTENT_LENGTH"] = self.__guard.max_body_size
+        self.__inflight: int = 0
+        self.__timeouts: dict[str, int] = {}
+        self.__serial_locks: limits.KeyedLock = limits.KeyedLock()
+        self.__state_store: state.StateStore = (
+            state_store if state_store is not None else state.MemoryStateStore()
+        )
+        self.__autocomplete_cache: autocomplete.AutocompleteCache = (
+            autocomplete.AutocompleteCache()
+        )
+        self.__completions: autocomplete.CompletionTracker = (
+            autocomplete.CompletionTracker()
+        )
+        self.__deduplicator: dedupe.InteractionDeduplicator = (
+            dedupe.InteractionDeduplicator()
+        )
+        self.__codec: codec.JSONCodec = codec.get_codec(json_codec)
+        self.__http: rest.RESTClient = rest.RESTClient(
+            api_base_url, session=http_session, codec=self.__codec
+        )
+        self.__credentials: auth.ClientCredentials = auth.ClientCredentials(
+            self.__http, client_id, client_secret
+        )
         self.add_url_rule(
             "/interactions", "interactions", self.interactions, methods=["POST"]
         )
+        self.__tasks: tasks.TaskSupervisor = tasks.TaskSupervisor(logger=self.logger)
+        self.__expiry: expiry.ComponentExpiry = expiry.ComponentExpiry(
+            self.__expire_components, logger=self.logger
+        )
+        self.before_serving(self.__apply_body_limit)
+        self.before_serving(self.__expiry.start)
+        self.after_serving(self.__tasks.drain)  # before closing the client followups use
+        self.after_serving(self.__expiry.stop)
+        self.after_serving(self.__state_store.close)
+        self.after_serving(self.__http.close)
 
     @property
     def cache(self) -> cache.ApplicationCache:
         return self.__cache
+
+    @property
+    def tasks(self) -> tasks.TaskSupervisor:
+        """Runs ack'd handlers and after interaction hooks. Its limits can be adjusted,
+        and `tasks.stats` reports active, queued and failed counts."""
+        return self.__tasks
+
+    @property
+    def timeouts(self) -> dict[str, int]:
+        """Handlers cancelled for exceeding their time limit, counted per command,
+        component or autocomplete name."""
+        return dict(self.__timeouts)
+
+    def serve(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: None | int = None,
+        backlog: int = 1024,
+        use_uvloop: bool = True,
+        certfile: None | str = None,
+        keyfile: None | str = None,
+    ):
+        """
+        Serves the application from pre-forked worker processes
+
+        Unlike `run`, which is a single process development server, every worker runs
+        its own event loop, on uvloop when installed, and accepts connections on the
+        same port through SO_REUSEPORT. Workers that crash are restarted. Blocks until
+        SIGINT or SIGTERM, then lets every worker shut down gracefully.
+
+        Load packages, or a manifest, before calling this so they are imported once and
+        their memory is shared with the workers rather than loaded by each of them.
+        State held in memory, such as the default component state store, cooldowns
+        and the interaction deduplicator, is kept per worker.
+
+        Parameters
+        ----------
+        host: str
+            The address to listen on. Defaults to loopback only.
+        port: int
+            The port to listen on. Defaults to 8000.
+        workers: Optional[int]
+            Worker processes. Defaults to the number of CPUs.
+        backlog: int
+            Pending connections queued per listening socket. Defaults to 1024.
+        use_uvloop: bool
+            Run workers on uvloop if it is installed. Defaults to True.
+        certfile: Optional[str]
+            Path to the SSL certificate file.
+        keyfile: Optional[str]
+            Path to the SSL key file.
+        """
+        workers = workers or os.cpu_count() or 1
+        options = (backlog, use_uvloop, certfile, keyfile)
+        if not hasattr(os, "fork"):
+            if workers > 1:
+                raise ValueError("Serving with several workers needs os.fork")
+            sock = prefork.bind(host, port, reuse_port=False)
+            prefork.run_worker(self, sock, *options)
+            return
+
+        # bound before forking so a taken address fails here rather than in every worker
+        listener = prefork.bind(host, port)
+        if not prefork.REUSE_PORT:
+            listener.listen(backlog)
+
+        def worker(index: int):
+            sock = listener
+            if prefork.REUSE_PORT:
+                listener.close()
+                sock = prefork.bind(host, port)
+            prefork.run_worker(self, sock, *options)
+
+        try:
+            prefork.Supervisor(worker, workers, logger=self.logger).run()
+        finally:
+            listener.close()
+
+    def occupancy(self) -> dict[str, dict]:
+        """Interactions running and waiting per command, sub command and component
+        declared with max_concurrency."""
+        return {
+            self.__handler_name(handler): handler.max_concurrency.stats
+            for handler in (
+                *self.__router.commands.values(),
+                *self.__router.components.values(),
+            )
+            if not isinstance(handler, router.PackageStub)
+            and handler.max_concurrency is not None
+        }
+
+    @property
+    def component_expiry(self) -> expiry.ComponentExpiry:
+        """Messages whose components with a timeout are disabled, or removed when its
+        mode is set to 'remove', once the shortest of those timeouts passed."""
+        return self.__expiry
+
+    def track_components(
+        self,
+        context: Context,
+        data: dict,
+        message_id: None | int | str = None,
+        update: bool = False,
+    ):
+        """
+        Schedules the components of a sent message to expire
+
+        Called for responses, deferred responses and followups. Only components that
+        have a timeout expire, messages without any are ignored. Each message is
+        tracked once, so updating it replaces the earlier schedule. Edits go through
+        the interaction token while it is valid, and through the bot token after that
+        if one is set.
+
+        Parameters
+        ----------
+        data: dict
+            The message payload that was sent.
+        message_id: Optional[int | str]
+            The message id, None for the original response.
+        update: bool
+            The payload updated the message the component interaction came from.
+        """
+        timeouts = []
+        expiring = set()
+        for row in data.get("components", None) or ():
+            for item in row.get("components", ()):
+                if "custom_id" not in item:
+                    continue
+                try:
+                    component = self.__router.resolve_component(item["custom_id"])
+                except errors.ComponentNotFound:
+                    continue
+                if isinstance(component, router.PackageStub):
+                    continue  # its timeout is unknown until imported
+                if component.timeout is not None:
+                    timeouts.append(component.timeout)
+                    expiring.add(item["custom_id"])
+        if not timeouts:
+            return
+
+        message = context.raw.get("message", None)
+        if update and message is not None:
+            # components time out counting from when the message was sent
+            key = int(message["id"])
+            expires_at = utils.snowflake_time(key) + min(timeouts)
+        else:
+            key = context.id if message_id is None else int(message_id)
+            expires_at = time.time() + min(timeouts)
+        if (
+            expires_at - utils.snowflake_time(context.id)
+            < utils.INTERACTION_TOKEN_LIFETIME
+        ):
+            route = (
+                f"webhooks/{self.config['CLIENT_ID']}/{context.token}/messages/"
+                f"{'@original' if message_id is None else message_id}"
+            )
+        elif self.config["BOT_TOKEN"] is not None and message_id is not None:
+            route = f"channels/{context.channel_id}/messages/{message_id}"
+        else:
+            return  # no credentials will be able to edit it by then
+        self.__expiry.track(route, expires_at, data["components"], expiring, key)
+
+    async def __expire_components(self, route: str, payload: dict):
+        await self.make_https_request("PATCH", route, payload=payload)
+
+    @property
+    def state_store(self) -> state.StateStore:
+        return self.__state_store
+
+    async def store_state(
+        self, component_name: str, component_state, *args, token: None | str = None
+    ) -> str:
+        """
+        Stores component state and returns a custom_id carrying its token
+
+        The state expires after the component's timeout, or COMPONENT_STATE_TTL seconds
+        for components without one. See Context.stateful_custom_id.
+
+        Parameters
+        ----------
+        token: Optional[str]
+            Overwrites the state stored under an existing token.
+        """
+        component = self.__router.components.get(component_name, None)
+        ttl = getattr(component, "timeout", None)  # unknown for manifest stubs
+        if ttl is None:
+            ttl = self.config["COMPONENT_STATE_TTL"]
+        token = token or state.new_token()
+        await self.__state_store.put(token, component_state, ttl)
+        return custom_id.encode(component_name, token, *args)
+
+    async def __load_state(self, context: Context, component: identifiers.Component):
+        if component.state and custom_id.SEPARATOR in context.custom_id:
+            try:
+                context._state_token = custom_id.decode(
+                    context.custom_id, (str, *(component.args or ()))
+                )[0]
+            except ValueError:
+                return  # reported when the component decodes its arguments
+            context.state = await self.__state_store.get(context._state_token)
+
+    @property
+    def autocomplete_cache(self) -> autocomplete.AutocompleteCache:
+        """Choices cached for autocompletes declared with a cache_ttl. Its size can be
+        adjusted, and `autocomplete_cache.stats` reports hits and misses."""
+        return self.__autocomplete_cache
+
+    @property
+    def completions(self) -> autocomplete.CompletionTracker:
+        """Running autocompletes declared with supersede, `completions.stats` counts
+        those cancelled by a newer request."""
+        return self.__completions
+
+    @property
+    def deduplicator(self) -> dedupe.InteractionDeduplicator:
+        """Interaction ids seen while the DEDUPE_INTERACTIONS config is enabled,
+        `deduplicator.stats` reports duplicates and the memory held."""
+        return self.__deduplicator
+
+    @property
+    def verifier(self) -> verification.SignatureVerifier:
+        """Verifies request signatures. Its offload threshold and executor can be
+        adjusted, and `verifier.stats` reports time spent verifying."""
+        return self.__verifier
+
+    @property
+    def guard(self) -> verification.RequestGuard:
+        """Checks run before signature verification. The body size cap and replay
+        window can be adjusted, `guard.rejected` counts rejections per reason. The cap
+        is copied to MAX_CONTENT_LENGTH when serving starts."""
+        return self.__guard
+
+    async def __apply_body_limit(self):
+        self.config["MAX_CONTENT_LENGTH"] = self.__guard.max_body_size
+
+    @property
+    def codec(self) -> codec.JSONCodec:
+        return self.__codec
+
+    @property
+    def router(self) -> router.Router:
+        return self.__router
+
+    @property
+    def http(self) -> rest.RESTClient:
+        """The pooled client used by make_https_request. Connector limits can be
+        adjusted on it before the server starts serving."""
+        return self.__http
+
+    @property
+    def credentials(self) -> auth.ClientCredentials:
+        """The client credentials provider, exposes refresh latency and failure counters
+        through `credentials.stats`."""
+        return self.__credentials
     
     def get_package(self, package_name):
         return self.__packages.get(package_name, None)
@@ -67,38 +417,22 @@ class DisunityServer(quart.Quart):
     def error_handler(self, exc: Exception):
         raise exc
 
-    def verify(self, req):
-        signature, timestamp = (
+    async def verify(self, req, body: None | bytes = None):
+        """Aborts with 401 if the request is not signed by Discord."""
+        if body is None:
+            body = await req.get_data()
+
+        if not await self.__verifier.verify(
             req.headers["X-Signature-Ed25519"],
             req.headers["X-Signature-Timestamp"],
-        )
-        body = req.data.decode("utf-8")
-
-        try:
-            self.__key.verify((timestamp + body).encode(), bytes.fromhex(signature))
-        except BadSignatureError:
+            body,
+            self.__inflight,
+        ):
             quart.abort(401, "Invalid request signature")
 
-    def __generate_client_credentials(self):
-        response = requests.post(
-            "https://discord.com/api/" + "oauth2/token",
-            data={
-                "grant_type": "client_credentials",
-                "scope": "applications.commands.update",
-            },
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            auth=(self.config["CLIENT_ID"], self.config["CLIENT_SECRET"]),
-        )
-        response.raise_for_status()
-        data = response.json()
-
-        self.config["CLIENT_CREDENTIALS_TOKEN"] = data["access_token"]
-        self.config["CREDENTIALS_EXPIRE_IN"] = time.time() + data["expires_in"] / 2
-
-    def auth(self):
-        if self.config["CREDENTIALS_EXPIRE_IN"] < time.time():
-            self.__generate_client_credentials()
-        return {"Authorization": "Bearer " + self.config["CLIENT_CREDENTIALS_TOKEN"]}
+    async def auth(self) -> dict:
+        """Returns the Bearer authorization header for the application's client credentials."""
+        return {"Authorization": "Bearer " + await self.__credentials.get_token()}
 
     async def make_https_request(
         self,
@@ -117,7 +451,7 @@ class DisunityServer(quart.Quart):
             The method to use. Can be either: GET, PUT, PATCH, DELETE, POST
         url: str
             The url to make the request to. If performing a request to discord, do not include
-            'https://discord.com/api/v10', it will be automatically added.
+            'https://discord.com/api/v10', the client's base url will be automatically added.
         headers: Optional[dict]
             The headers to use for the request. If none are given, the application's Bearer
             client credentials will be used.
@@ -126,65 +460,208 @@ class DisunityServer(quart.Quart):
         files: Optional[list]
             A list of dictionaries with 'id', 'filename' and 'content'.
         """
-        if not url.startswith("https://"):
-            url = "https://discord.com/api/v10/" + url
-
         if headers is None and self.config["BOT_TOKEN"] is not None:
             headers = {"Authorization": "Bot " + self.config["BOT_TOKEN"]}
         elif headers is None:
-            headers = self.auth()
-
-        if files:
-            data = aiohttp.FormData()
-            if payload:
-                data.add_field(
-                    "payload_json",
-                    json.dumps(payload),
-                    content_type="application/json",
-                )
-            for file in files:
-                content_type, _ = mimetypes.guess_type(file["filename"])
-                if content_type is None:
-                    content_type = "application/octet-stream"
-                data.add_field(
-                    f"files[{file['id']}]",
-                    file["content"],
-                    filename=file["filename"],
-                    content_type=content_type,
-                )
-            request_kwargs = {"data": data}
-        else:
-            request_kwargs = {"json": payload} if payload else {}
-
-        async with aiohttp.ClientSession() as session:
-            async with session.request(
-                method, url, headers=headers, **request_kwargs
-            ) as maybe_response:
-                if override_checks:
-                    return maybe_response
-
-                if not str(maybe_response.status).startswith("20"):
-                    raise errors.HTTPRequestError(
-                        maybe_response.status, await maybe_response.json()
-                    )
+            headers = await self.auth()
+
+        maybe_response = await self.__http.request(
+            method, url, headers=headers, payload=payload, files=files
+        )
+        if override_checks:
+            return maybe_response
 
-                if maybe_response.status != 204:  # No Content response
-                    try:
-                        return await maybe_response.json()
-                    except Exception as e:
-                        self.error_handler(e)
+        if not str(maybe_response.status).startswith("20"):
+            raise errors.HTTPRequestError(
+                maybe_response.status, await self.__http.decode(maybe_response)
+            )
+
+        if maybe_response.status != 204:  # No Content response
+            try:
+                return await self.__http.decode(maybe_response)
+            except Exception as e:
+                self.error_handler(e)
 
     def load_package(self, package_path):
         package = importlib.import_module(package_path)
         setup = getattr(package, "setup")
 
-        setup(self)
+        self.__loading = package_path
+        try:
+            setup(self)
+        finally:
+            self.__loading = None
 
     def register_package(self, package_class):
+        if self.__staged is not None:
+            self.__staged.append(package_class)
+            return
+
         self.__packages[package_class.__class__.__name__] = package_class
         contents = package_class.unpack()
         for item in contents:
             self.__cache.add_item(item)
+            self.__router.add_item(item)
+
+        names, items = self.__modules.setdefault(
+            self.__loading or type(package_class).__module__, ([], [])
+        )
+        names.append(package_class.__class__.__name__)
+        items.extend(contents)
+
+    def reload_package(self, package_path):
+        """
+        Re-imports a package module and swaps its routes in at once
+
+        The module is re-executed and its setup run again. Interactions already running
+        finish on the old code, later ones use the new code. Nothing changes if the
+        import or setup raises. Other packages, and their cached autocomplete results,
+        are left alone. Only the module itself is re-imported, not modules it imports.
+
+        Parameters
+        ----------
+        package_path: str
+            The module path given to load_package.
+        """
+        module = sys.modules.get(package_path, None)
+        if module is None:
+            module = importlib.import_module(package_path)
+        else:
+            module = importlib.reload(module)
+
+        self.__swap(package_path, self.__setup_staged(module))
+
+    def unload_package(self, package_path):
+        """
+        Removes the routes and packages registered by a package module
+
+        Raises
+        ------
+        PackageNotLoaded
+            No package was registered from the module.
+        """
+        if package_path not in self.__modules:
+            raise errors.PackageNotLoaded(package_path)
+        self.__swap(package_path, [])
+
+    def __setup_staged(self, module) -> list:
+        """Runs a module's setup, returning the packages it registers instead."""
+        self.__staged = []
+        try:
+            getattr(module, "setup")(self)
+            return self.__staged
+        finally:
+            self.__staged = None
+
+    def build_manifest(self, package_paths: list[str]) -> dict:
+        """
+        Imports package modules and describes the routes they register
+
+        The server is left unchanged. See the manifest module.
+        """
+        return {
+            "version": manifest.VERSION,
+            "packages": {
+                package_path: manifest.describe(
+                    [
+                        item
+                        for package in self.__setup_staged(
+                            importlib.import_module(package_path)
+                        )
+                        for item in package.unpack()
+                    ]
+                )
+                for package_path in package_paths
+            },
+        }
+
+    def save_manifest(self, path: str, package_paths: list[str]):
+        manifest.dump(self.build_manifest(package_paths), path)
+
+    def load_manifest(self, source: str | dict, warm: bool = False):
+        """
+        Registers the routes of a manifest without importing the packages
+
+        Each package module is imported, off the event loop, when one of its routes is
+        first used. Until then its routes cost nothing but a dictionary entry.
+
+        Parameters
+        ----------
+        source: str | dict
+            The manifest file, or a manifest from build_manifest.
+        warm: bool
+            Import every package in the background once the server is serving, so
+            only interactions arriving before that wait for an import. Defaults to
+            False.
+        """
+        if isinstance(source, str):
+            source = manifest.load(source)
+
+        for package_path, routes in source["packages"].items():
+            if package_path in self.__modules:
+                continue  # already imported
+            stub = router.PackageStub(package_path, routes)
+            self.__router.add_item(stub)
+            self.__modules[package_path] = ([], [stub])
+
+        if warm:
+            self.before_serving(self.__start_warming)
+
+    async def __start_warming(self):
+        self.__tasks.spawn(self.warm_packages())
+
+    async def warm_packages(self):
+        """Imports every package module still registered from a manifest."""
+        for package_path, (_, items) in list(self.__modules.items()):
+            if items and isinstance(items[0], router.PackageStub):
+                await self.__import_stub(items[0])
+
+    async def __import_stub(self, stub):
+        importing = self.__imports.get(stub.module, None)
+        if importing is None:
+            importing = self.__imports[stub.module] = asyncio.ensure_future(
+                self.__import_package(stub.module)
+            )
+        await asyncio.shield(importing)
+
+    async def __import_package(self, package_path: str):
+        try:
+            module = await asyncio.to_thread(importlib.import_module, package_path)
+            items = self.__modules.get(package_path, ([], []))[1]
+            if items and isinstance(items[0], router.PackageStub):
+                # not unloaded or reloaded meanwhile
+                self.__swap(package_path, self.__setup_staged(module))
+        finally:
+            del self.__imports[package_path]
+
+    def __swap(self, package_path: str, packages: list):
+        old_names, old_items = self.__modules.pop(package_path, ([], []))
+        new_items = [item for package in packages for item in package.unpack()]
+
+        new_router = self.__router.copy()
+        new_cache = self.__cache.copy()
+        for item in old_items:
+            new_router.remove_item(item)
+            if not isinstance(item, router.PackageStub):
+                new_cache.remove_item(item)
+        for item in new_items:
+            new_router.add_item(item)
+            new_cache.add_item(item)
+        self.__router, self.__cache = new_router, new_cache
+
+        for name in old_names:
+            self.__packages.pop(name, None)
+        for package in packages:
+            self.__packages[package.__class__.__name__] = package
+        if packages:
+            self.__modules[package_path] = (
+                [package.__class__.__name__ for package in packages],
+                new_items,
+            )
+
+        for item in old_items:
+            if isinstance(item, identifiers.Autocomplete):
+                self.__autocomplete_cache.clear(item.command_name)
 
     async def global_check(self, context: Context) -> bool:
         """Global check for all application commands, message components and modal submits.
@@ -215,162 +692,373 @@ class DisunityServer(quart.Quart):
         """
         pass
 
+    def respond(self, payload: dict) -> quart.Response:
+        """Writes an interaction response as pre-encoded JSON bytes."""
+        return quart.Response(
+            self.__codec.dumps(payload), content_type="application/json"
+        )
 
-    async def interactions(self):
-        self.verify(request)
-        received = request.json
+    async def __invoke(
+        self,
+        context: Context,
+        handler: identifiers.Command
+        | identifiers.SubCommand
+        | identifiers.Component,
+        deferred_type: None | int = None,
+    ):
+        if handler.cooldown is not None:
+            retry_after = handler.cooldown.hit(context)
+            if retry_after:
+                message = handler.cooldown.message or self.config["COOLDOWN_MESSAGE"]
+                return self.__ephemeral(message.format(retry_after=retry_after))
 
-        if received["type"] == utils.InteractionTypes.PING:
-            return jsonify({"type": utils.InteractionCallbackTypes.PONG})
+        check = await self.global_check(context)
+        if check != True:
+            if isinstance(check, dict) and "type" in check:
+                return self.respond(check)
+            else:
+                return self.respond({"type": utils.InteractionCallbackTypes.PONG})
 
-        elif received["type"] == utils.InteractionTypes.APPLICATION_COMMAND:
-            command = self.__cache.commands[str(received["type"])].get(
-                received["data"]["name"], None
-            )
-            if command is None:
-                raise errors.CommandNotFound(received["data"]["name"])
-
-            coroutine: identifiers.Command | identifiers.SubCommand | None = None
-            match received["data"]:
-                case {
-                    "options": [{"name": name, "options": options, "type": 2}]
-                }:  # Sub command group
-                    if not isinstance(command, identifiers.CacheableSubCommand):
-                        raise errors.InvalidMethodUse(
-                            "Commands with sub commands must be registered using the Package.sub decorator"
-                        )
+        await self.global_before_interaction(context)
 
-                    coroutine = command.map[str(name)].get(options[0]["name"], None)
-                    received["data"]["injected"] = options[0]["options"]
+        slot = None
+        if handler.max_concurrency is not None:
+            limit = handler.max_concurrency
+            key = limits.scope_key(context, limit.scope)
+            # modal submits are not deferred, waiting would outlast the deadline
+            slot = limit.reserve(key, wait=deferred_type is not None)
+            if slot is None:
+                return self.__ephemeral(
+                    limit.message or self.config["CONCURRENCY_MESSAGE"]
+                )
 
-                case {
-                    "options": [{"name": name, "options": options, "type": 1}]
-                }:  # Sub command
-                    if not isinstance(command, identifiers.CacheableSubCommand):
-                        raise errors.InvalidMethodUse(
-                            "Sub commands must be registered using the Package.sub decorator"
-                        )
+        if deferred_type is not None and (
+            handler.ack or (slot is not None and not slot.done())
+        ):
+            if not self.__tasks.has_capacity:
+                if slot is not None:
+                    limit.cancel(key, slot)
+                quart.abort(503, "Too many interactions in progress")
 
-                    coroutine = command.map["sub_commands"].get(name, None)
-                    received["data"]["injected"] = options
-
-                case {"options": options}:  # command with options
-                    coroutine = command
-                    received["data"]["injected"] = options
-
-                case _:  # default to regular
-                    coroutine = command
-                    received["data"]["injected"] = []
-
-            ctx: Context = Context(self, received)
-            if coroutine is None:
-                raise errors.CommandNotFound(ctx.command_name)
-            
-            check = await self.global_check(ctx)
-            if check != True:
-                if isinstance(check, dict) and "type" in check:
-                    return jsonify(check)
-                else:
-                    return jsonify({"type": utils.InteractionCallbackTypes.PONG})
-            
-            await self.global_before_interaction(ctx)
-
-            if coroutine.ack:
-                response = {
-                    "type": utils.InteractionCallbackTypes.DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE
-                }
-                if coroutine.ephemeral:
-                    response["data"]["flags"] = 64
-
-                async def combined_task(ctx):
-                    await coroutine(ctx)
-                    await self.global_after_interaction(ctx)
-
-                asyncio.create_task(combined_task(ctx))
-                ctx.acked = True
-                return jsonify(response)
-
-            response = await coroutine(ctx)
-            asyncio.create_task(self.global_after_interaction(ctx))
-            return jsonify(response)
-
-        elif received["type"] == utils.InteractionTypes.MESSAGE_COMPONENT:
-            context: Context = Context(self, received)
-            component: identifiers.Component = self.__cache.components.get(
-                str(context.custom_id).split("-")[0], None
-            )
+            response = {"type": deferred_type}
+            if handler.ephemeral:
+                response["data"] = {"flags": 64}
 
-            if component is None:
-                raise errors.ComponentNotFound(context.custom_id.split("-")[0])
+            context.acked = context._deferred = True
+
+            if handler.ack:
 
-            check = await self.global_check(context)
-            if check != True:
-                if isinstance(check, dict) and "type" in check:
-                    return jsonify(check)
-                else:
-                    return jsonify({"type": utils.InteractionCallbackTypes.PONG})
-            
-            await self.global_before_interaction(context)
-
-            if component.ack:
-                response = {
-                    "type": utils.InteractionCallbackTypes.DEFERRED_UPDATE_MESSAGE
-                }
-                if component.ephemeral:
-                    response = {
-                        "type": utils.InteractionCallbackTypes.DEFERRED_UPDATE_MESSAGE,
-                        "data": {"flags": 64},
-                    }
-
-                context.acked = True
                 async def combined_task(context):
-                    await component(context)
+                    await self.__run(context, handler, slot)
                     await self.global_after_interaction(context)
 
-                asyncio.create_task(combined_task(context))
-                return jsonify(response)
+                self.__tasks.spawn(combined_task(context))
+            else:  # waiting for a concurrency slot
+                self.__tasks.spawn(
+                    self.__finish_deferred(context, self.__run(context, handler, slot))
+                )
+            return self.respond(response)
 
-            maybe_response = await component(context)
-            asyncio.create_task(self.global_after_interaction(context))
-            return jsonify(maybe_response)
+        if deferred_type is not None and handler.auto_defer:
+            budget = (
+                self.config["AUTO_DEFER_BUDGET"]
+                if handler.auto_defer is True
+                else handler.auto_defer
+            )
+            running = asyncio.ensure_future(self.__run(context, handler, slot))
+            done, _ = await asyncio.wait({running}, timeout=budget)
 
-        elif (
-            received["type"] == utils.InteractionTypes.APPLICATION_COMMAND_AUTOCOMPLETE
-        ):
-            context: Context = Context(self, received)
+            if not done:
+                if not self.__tasks.has_capacity:
+                    # waiting on inline would answer after Discord's deadline
+                    running.cancel()
+                    quart.abort(503, "Too many interactions in progress")
+
+                response = {"type": deferred_type}
+                if handler.ephemeral:
+                    response["data"] = {"flags": 64}
 
-            autocomplete: identifiers.Autocomplete = self.__cache.autocompletes.get(
-                str(context.command_name), None
+                context.acked = context._deferred = True
+                self.__tasks.spawn(self.__finish_deferred(context, running))
+                return self.respond(response)
+
+            response = running.result()
+        else:
+            response = await self.__run(context, handler, slot)
+
+        if isinstance(response, dict) and response.get("type", None) in (
+            utils.InteractionCallbackTypes.CHANNEL_MESSAGE_WITH_SOURCE,
+            utils.InteractionCallbackTypes.UPDATE_MESSAGE,
+        ):
+            self.track_components(
+                context,
+                response.get("data", {}),
+                update=response["type"] == utils.InteractionCallbackTypes.UPDATE_MESSAGE,
             )
 
-            if autocomplete is None:
-                raise errors.AutocompleteNotFound(context.command_name)
+        self.__tasks.spawn(self.global_after_interaction(context))
+        return self.respond(response)
 
-            maybe_choices = await autocomplete(context)
-            response = {
-                "type": utils.InteractionCallbackTypes.APPLICATION_COMMAND_AUTOCOMPLETE_RESULT,
-                "data": {"choices": maybe_choices or []},
+    async def __run(
+        self,
+        context: Context,
+        handler: identifiers.Command
+        | identifiers.SubCommand
+        | identifiers.Component
+        | identifiers.Autocomplete,
+        slot: None | asyncio.Future = None,
+    ):
+        """
+        Awaits a handler once its concurrency `slot`, if reserved, and its serial lock,
+        for components declared with serialize, are held
+        """
+        if slot is not None:
+            key = limits.scope_key(context, handler.max_concurrency.scope)
+            try:
+                await slot
+            except asyncio.CancelledError:
+                handler.max_concurrency.cancel(key, slot)
+                raise
+            try:
+                return await self.__run(context, handler)
+            finally:
+                handler.max_concurrency.release(key)
+
+        if (
+            isinstance(handler, identifiers.Component)
+            and handler.serialize is not None
+        ):
+            async with self.__serial_locks.hold(
+                limits.serial_key(context, handler.serialize)
+            ):
+                return await self.__run_timed(context, handler)
+
+        return await self.__run_timed(context, handler)
+
+    async def __run_timed(
+        self,
+        context: Context,
+        handler: identifiers.Command
+        | identifiers.SubCommand
+        | identifiers.Component
+        | identifiers.Autocomplete,
+    ):
+        """
+        Awaits a handler within its time limit
+
+        A handler that runs out of time is cancelled and its fallback is returned, or
+        sent after the deferred response if the server deferred in the meantime.
+        """
+        limit = (
+            self.config["HANDLER_TIME_LIMIT"]
+            if handler.time_limit is None
+            else handler.time_limit
+        )
+        if not limit:
+            return await handler(context)
+
+        try:
+            return await asyncio.wait_for(handler(context), limit)
+        except asyncio.TimeoutError:
+            name = self.__handler_name(handler)
+            self.__timeouts[name] = self.__timeouts.get(name, 0) + 1
+            self.logger.warning("%s was cancelled after %s seconds", name, limit)
+
+            if context._deferred and handler.fallback is not None:
+                await self.send_deferred_response(context, handler.fallback)
+                return None
+            return handler.fallback
+
+    @staticmethod
+    def __handler_name(
+        handler: identifiers.Command
+        | identifiers.SubCommand
+        | identifiers.Component
+        | identifiers.Autocomplete,
+    ) -> str:
+        if isinstance(handler, identifiers.Autocomplete):
+            return handler.command_name + " autocomplete"
+        if isinstance(handler, identifiers.SubCommand):
+            return handler.qualified_name
+        return handler.name
+
+    def __ephemeral(self, content: str) -> quart.Response:
+        return self.respond(
+            {
+                "type": utils.InteractionCallbackTypes.CHANNEL_MESSAGE_WITH_SOURCE,
+                "data": {"content": content, "flags": 64},
             }
-            return jsonify(response)
+        )
+
+    async def __finish_deferred(self, context: Context, running: Awaitable):
+        response = await running
+        if isinstance(response, dict):
+            await self.send_deferred_response(context, response)
+        await self.global_after_interaction(context)
+
+    async def send_deferred_response(self, context: Context, response: dict):
+        """
+        Delivers an interaction response after the interaction was deferred
+
+        UPDATE_MESSAGE responses, and message responses to commands, edit the original
+        response. Message responses to components are sent as a followup.
+        """
+        route = f"webhooks/{self.config['CLIENT_ID']}/{context.token}"
 
-        elif received["type"] == utils.InteractionTypes.MODAL_SUBMIT:
-            context: Context = Context(self, received)
-            component: identifiers.Component = self.__cache.components.get(
-                str(context.custom_id).split("-")[0], None
+        if response["type"] == utils.InteractionCallbackTypes.UPDATE_MESSAGE or (
+            response["type"]
+            == utils.InteractionCallbackTypes.CHANNEL_MESSAGE_WITH_SOURCE
+            and context.interaction_type != utils.InteractionTypes.MESSAGE_COMPONENT
+        ):
+            await self.make_https_request(
+                "PATCH", route + "/messages/@original", payload=response["data"]
             )
+            self.track_components(
+                context,
+                response["data"],
+                update=response["type"] == utils.InteractionCallbackTypes.UPDATE_MESSAGE,
+            )
+        elif (
+            response["type"]
+            == utils.InteractionCallbackTypes.CHANNEL_MESSAGE_WITH_SOURCE
+        ):
+            message = await self.make_https_request(
+                "POST", route, payload=response["data"]
+            )
+            self.track_components(context, response["data"], message["id"])
+        else:
+            raise errors.InvalidMethodUse(
+                f"Responses of type {response['type']} cannot be sent after deferring"
+            )
+
+    async def __ping(self, received: dict):
+        return self.respond({"type": utils.InteractionCallbackTypes.PONG})
+
+    async def __resolve(self, method: str, *args):
+        """Resolves a route, importing its package first if it is still a stub."""
+        resolved = getattr(self.__router, method)(*args)
+        stub = resolved[0] if isinstance(resolved, tuple) else resolved
+        if isinstance(stub, router.PackageStub):
+            await self.__import_stub(stub)
+            resolved = getattr(self.__router, method)(*args)
+        return resolved
+
+    async def __application_command(self, received: dict):
+        coroutine, options = await self.__resolve(
+            "resolve_command", received["type"], received["data"]
+        )
+        received["data"]["injected"] = options
+        return await self.__invoke(
+            Context(self, received),
+            coroutine,
+            utils.InteractionCallbackTypes.DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE,
+        )
+
+    async def __message_component(self, received: dict):
+        component = await self.__resolve(
+            "resolve_component", received["data"]["custom_id"]
+        )
+        context = Context(self, received)
+        await self.__load_state(context, component)
+        return await self.__invoke(
+            context,
+            component,
+            utils.InteractionCallbackTypes.DEFERRED_UPDATE_MESSAGE,
+        )
 
-            if component is None:
-                raise errors.ComponentNotFound(context.custom_id.split("-")[0])
+    async def __autocomplete(self, received: dict):
+        handler = await self.__resolve("resolve_autocomplete", received["data"]["name"])
+        path, name, text = autocomplete.focused(received["data"].get("options", []))
+        option = autocomplete.option_key(path, name)
 
-            check = await self.global_check(context)
-            if check != True:
-                if isinstance(check, dict) and "type" in check:
-                    return jsonify(check)
+        if option in handler.index:
+            maybe_choices = handler.index[option].search(text)
+        elif handler.cache_ttl:
+            maybe_choices = self.__autocomplete_cache.get(
+                handler.command_name, option, text
+            )
+            if maybe_choices is None:
+                maybe_choices = await self.__complete(
+                    Context(self, received), handler, option
+                )
+                if (
+                    isinstance(maybe_choices, list)
+                    and maybe_choices is not handler.fallback
+                ):
+                    self.__autocomplete_cache.put(
+                        handler.command_name,
+                        option,
+                        text,
+                        maybe_choices,
+                        handler.cache_ttl,
+                        handler.cache_match,
+                    )
+        else:
+            maybe_choices = await self.__complete(
+                Context(self, received), handler, option
+            )
+
+        response = {
+            "type": utils.InteractionCallbackTypes.APPLICATION_COMMAND_AUTOCOMPLETE_RESULT,
+            "data": {"choices": maybe_choices or []},
+        }
+        return self.respond(response)
+
+    async def __complete(
+        self, context: Context, handler: identifiers.Autocomplete, option: None | str
+    ):
+        if not handler.supersede:
+            return await self.__run(context, handler)
+        return await self.__completions.run(
+            (context.invoked_by.id, handler.command_name, option),
+            self.__run(context, handler),
+        )
+
+    async def __modal_submit(self, received: dict):
+        component = await self.__resolve(
+            "resolve_component", received["data"]["custom_id"]
+        )
+        context = Context(self, received)
+        await self.__load_state(context, component)
+        return await self.__invoke(context, component)
+
+    async def interactions(self):
+        self.__inflight += 1
+        try:
+            rejection = self.__guard.check_headers(
+                request.headers, request.content_length
+            )
+            if rejection is None:
+                try:
+                    body = await request.get_data()
+                except RequestEntityTooLarge:
+                    rejection = self.__guard.body_too_large()
                 else:
-                    return jsonify({"type": utils.InteractionCallbackTypes.PONG})
-            
-            await self.global_before_interaction(context)
+                    rejection = self.__guard.check_body(body)
+            if rejection is not None:
+                quart.abort(*rejection)
 
-            maybe_response = await component(context)
-            asyncio.create_task(self.global_after_interaction(context))
-            return jsonify(maybe_response)
+            await self.verify(request, body)
+            received = self.__codec.loads(body)
+
+            handler = self.__dispatch.get(received["type"], None)
+            if handler is None:
+                quart.abort(400, "Unknown interaction type")
+
+            deduplicate = (
+                self.config["DEDUPE_INTERACTIONS"]
+                and received["type"] != utils.InteractionTypes.PING
+            )
+            if deduplicate and self.__deduplicator.seen(received["id"]):
+                quart.abort(409, "Interaction already received")
+            try:
+                return await handler(received)
+            except BaseException as error:
+                if deduplicate and not (
+                    isinstance(error, HTTPException) and error.code < 500
+                ):
+                    # nothing was answered, Discord's retry must not get a 409
+                    self.__deduplicator.forget(received["id"])
+                raise
+        finally:
+            self.__inflight -= 1
@@ -0,0 +1,171 @@
+"""
+Server side state for components
+
+Instead of packing state into the custom_id, it is stored on the server under a short
+token which is sent as the first argument of the custom_id. Components declared with
+state=True get it back as `ctx.state`.
+
+Example
+-------
+@Package.command("shop")
+
+async def shop(self, ctx: Context):
+    next_id = await ctx.stateful_custom_id("page", {"items": items, "page": 0})
+    ...
+
+@Package.component("page", state=True, timeout=300.0)
+
+async def page(self, ctx: Context):
+    ctx.state["page"] += 1
+    await ctx.save_state()
+"""
+import abc
+import asyncio
+import collections
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from .codec import JSONCodec, get_codec
+
+
+def new_token() -> str:
+    """A random 8 character token, 48 bits of entropy."""
+    return secrets.token_urlsafe(6)
+
+
+class StateStore(abc.ABC):
+    """
+    Interface of component state backends
+
+    Every method is a coroutine so backends can do I/O, except `close` which the server
+    calls when it stops serving. `get` returns None for unknown or expired tokens.
+    """
+
+    @abc.abstractmethod
+    async def put(self, token: str, state: Any, ttl: float):
+        ...
+
+    @abc.abstractmethod
+    async def get(self, token: str) -> Any:
+        ...
+
+    @abc.abstractmethod
+    async def delete(self, token: str):
+        ...
+
+    def close(self):
+        """Releases the backend's resources. Does nothing by default."""
+
+
+class MemoryStateStore(StateStore):
+    """
+    In process state, evicted least recently used first once `max_entries` is reached
+
+    Parameters
+    ----------
+    max_entries: int
+        States kept at most. Defaults to 10,000.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries: int = max_entries
+        self.__states: collections.OrderedDict[
+            str, tuple[float, Any]
+        ] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__states)
+
+    async def put(self, token: str, state: Any, ttl: float):
+        self.__states[token] = (time.monotonic() + ttl, state)
+        self.__states.move_to_end(token)
+        while len(self.__states) > self.max_entries:
+            self.__states.popitem(last=False)
+
+    async def get(self, token: str) -> Any:
+        entry = self.__states.get(token, None)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self.__states[token]
+            return None
+        self.__states.move_to_end(token)
+        return entry[1]
+
+    async def delete(self, token: str):
+        self.__states.pop(token, None)
+
+
+class SQLiteStateStore(StateStore):
+    """
+    State kept in an SQLite database, so it survives restarts
+
+    States are encoded with a JSON codec, so they must be JSON serializable. Queries run
+    in a worker thread. Expired rows are purged every `purge_every` writes.
+
+    Parameters
+    ----------
+    path: str
+        The database file.
+    codec: Optional[str | codec.JSONCodec]
+        Codec states are encoded with. Defaults to the standard library.
+    purge_every: int
+        Writes between purges of expired rows. Defaults to 1000.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        codec: None | str | JSONCodec = None,
+        purge_every: int = 1000,
+    ):
+        self.path: str = path
+        self.purge_every: int = purge_every
+        self.__codec: JSONCodec = get_codec(codec)
+        self.__lock: threading.Lock = threading.Lock()
+        self.__writes: int = 0
+        self.__connection: sqlite3.Connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS component_state "
+            "(token TEXT PRIMARY KEY, state BLOB NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def __execute(self, query: str, parameters: tuple = ()) -> list[tuple]:
+        with self.__lock:
+            return self.__connection.execute(query, parameters).fetchall()
+
+    async def put(self, token: str, state: Any, ttl: float):
+        self.__writes += 1
+        if not self.__writes % self.purge_every:
+            await asyncio.to_thread(
+                self.__execute,
+                "DELETE FROM component_state WHERE expires <= ?",
+                (time.time(),),
+            )
+        await asyncio.to_thread(
+            self.__execute,
+            "INSERT OR REPLACE INTO component_state VALUES (?, ?, ?)",
+            (token, self.__codec.dumps(state), time.time() + ttl),
+        )
+
+    async def get(self, token: str) -> Any:
+        rows = await asyncio.to_thread(
+            self.__execute,
+            "SELECT state FROM component_state WHERE token = ? AND expires > ?",
+            (token, time.time()),
+        )
+        return self.__codec.loads(rows[0][0]) if rows else None
+
+    async def delete(self, token: str):
+        await asyncio.to_thread(
+            self.__execute, "DELETE FROM component_state WHERE token = ?", (token,)
+        )
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
@@ -0,0 +1,135 @@
+import asyncio
+import collections
+import logging
+import time
+from typing import Coroutine
+
+
+class TaskSupervisor:
+    """
+    Runs background work such as ack'd handlers and after interaction hooks
+
+    Holds strong references to every task so none are garbage collected mid-flight,
+    logs their exceptions, and bounds how many run at once. Work over the concurrency
+    limit waits in a bounded backlog, anything beyond it is rejected.
+
+    Parameters
+    ----------
+    max_concurrency: int
+        Tasks allowed to run at once. Defaults to 256.
+    max_backlog: int
+        Coroutines allowed to wait for a free slot. Defaults to 1024.
+    drain_timeout: float
+        Seconds `drain` waits for in-flight work before cancelling it. Defaults to 10.
+    logger: Optional[logging.Logger]
+        Where task exceptions are logged. Defaults to the 'disunity' logger.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 256,
+        max_backlog: int = 1024,
+        drain_timeout: float = 10.0,
+        logger: None | logging.Logger = None,
+    ):
+        self.max_concurrency: int = max_concurrency
+        self.max_backlog: int = max_backlog
+        self.drain_timeout: float = drain_timeout
+        self.logger: logging.Logger = logger or logging.getLogger("disunity")
+        self.closing: bool = False
+
+        self.completed: int = 0
+        self.failed: int = 0
+        self.cancelled: int = 0
+        self.rejected: int = 0
+        self.__active: set[asyncio.Task] = set()
+        self.__backlog: collections.deque[Coroutine] = collections.deque()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "active": len(self.__active),
+            "queued": len(self.__backlog),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+        }
+
+    @property
+    def has_capacity(self) -> bool:
+        return not self.closing and (
+            len(self.__active) < self.max_concurrency
+            or len(self.__backlog) < self.max_backlog
+        )
+
+    def spawn(self, coroutine: Coroutine) -> bool:
+        """
+        Runs `coroutine` in the background, or queues it if the limit is reached
+
+        Returns False, and closes the coroutine, if the backlog is full or the
+        supervisor is draining.
+        """
+        if len(self.__active) < self.max_concurrency and not self.closing:
+            self.__start(coroutine)
+        elif len(self.__backlog) < self.max_backlog and not self.closing:
+            self.__backlog.append(coroutine)
+        else:
+            coroutine.close()
+            self.rejected += 1
+            return False
+        return True
+
+    def __start(self, coroutine: Coroutine):
+        task = asyncio.create_task(coroutine)
+        self.__active.add(task)
+        task.add_done_callback(self.__done)
+
+    def __done(self, task: asyncio.Task):
+        self.__active.discard(task)
+
+        if task.cancelled():
+            self.cancelled += 1
+        elif task.exception() is not None:
+            self.failed += 1
+            self.logger.error(
+                "Background task %s failed",
+                task.get_coro().__qualname__,
+                exc_info=task.exception(),
+            )
+        else:
+            self.completed += 1
+
+        while self.__backlog and len(self.__active) < self.max_concurrency:
+            self.__start(self.__backlog.popleft())
+
+    async def drain(self, timeout: None | float = None):
+        """
+        Stops accepting work and waits for in-flight and queued tasks
+
+        Whatever is still running after `timeout` (or `drain_timeout`) seconds is
+        cancelled.
+        """
+        self.closing = True
+        deadline = time.monotonic() + (
+            self.drain_timeout if timeout is None else timeout
+        )
+
+        while self.__active:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.wait(
+                set(self.__active),
+                timeout=remaining,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+        while self.__backlog:
+            self.__backlog.popleft().close()
+            self.cancelled += 1
+
+        for task in list(self.__active):
+            task.cancel()
+        if self.__active:
+            await asyncio.wait(set(self.__active))
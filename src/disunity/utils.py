@@ -2,6 +2,9 @@ from enum import Enum, IntEnum
 
 __version__ = "0.1.3"
 
+DISCORD_EPOCH = 1420070400000  # milliseconds, the first second of 2015
+INTERACTION_TOKEN_LIFETIME = 900.0  # seconds
+
 
 class InteractionTypes(IntEnum):
     PING = 1
@@ -40,3 +43,8 @@ def return_avatar_as_cdn(avatar, uid):
         suffix = "gif" if animated else "png"
         return f"https://cdn.discordapp.com/avatars/{uid}/{avatar}.{suffix}?size=1024"
     return f"https://cdn.discordapp.com/embed/avatars/{uid%len(DefaultAvatars)}.png"
+
+
+def snowflake_time(snowflake: int | str) -> float:
+    """Returns when a snowflake was created, in seconds since the Unix epoch."""
+    return ((int(snowflake) >> 22) + DISCORD_EPOCH) / 1000
@@ -0,0 +1,167 @@
+import asyncio
+import re
+import time
+from concurrent.futures import Executor
+
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+
+SIGNATURE_PATTERN = re.compile(r"[0-9a-fA-F]{128}")
+
+
+class RequestGuard:
+    """
+    Cheap checks run on a request before its signature is verified
+
+    Oversized bodies, missing or malformed signature headers and timestamps outside of
+    the replay window are rejected without reading the body or verifying anything.
+
+    Parameters
+    ----------
+    max_body_size: int
+        Largest accepted body in bytes. Defaults to 256 KiB.
+    replay_window: float
+        Seconds X-Signature-Timestamp may differ from the current time. 0 disables the
+        check. Defaults to 300.
+    """
+
+    def __init__(self, max_body_size: int = 256 * 1024, replay_window: float = 300.0):
+        self.max_body_size: int = max_body_size
+        self.replay_window: float = replay_window
+        self.rejected: dict[str, int] = {
+            "body_size": 0,
+            "signature": 0,
+            "timestamp": 0,
+            "replay": 0,
+        }
+
+    def __reject(self, reason: str, status: int, message: str) -> tuple[int, str]:
+        self.rejected[reason] += 1
+        return status, message
+
+    def check_headers(
+        self, headers, content_length: None | int = None
+    ) -> None | tuple[int, str]:
+        """Returns the status and reason to reject the request with, or None."""
+        if content_length is not None and content_length > self.max_body_size:
+            return self.__reject("body_size", 413, "Request body too large")
+
+        signature = headers.get("X-Signature-Ed25519", None)
+        if signature is None or not SIGNATURE_PATTERN.fullmatch(signature):
+            return self.__reject("signature", 401, "Missing or malformed signature")
+
+        timestamp = headers.get("X-Signature-Timestamp", None)
+        if timestamp is None or not (timestamp.isascii() and timestamp.isdigit()):
+            return self.__reject("timestamp", 401, "Missing or malformed timestamp")
+
+        if (
+            self.replay_window
+            and abs(time.time() - int(timestamp)) > self.replay_window
+        ):
+            return self.__reject("replay", 401, "Timestamp outside of replay window")
+
+        return None
+
+    def check_body(self, body: bytes) -> None | tuple[int, str]:
+        """Checks the size of a body sent without, or with a wrong, Content-Length."""
+        if len(body) > self.max_body_size:
+            return self.body_too_large()
+        return None
+
+    def body_too_large(self) -> tuple[int, str]:
+        """Rejects a body cut off while it was read for exceeding `max_body_size`."""
+        return self.__reject("body_size", 413, "Request body too large")
+
+
+class SignatureVerifier:
+    """
+    Ed25519 verification of interaction requests
+
+    The signature, timestamp and body are joined into a single signed message buffer,
+    without decoding the body. Once `offload_threshold` requests are in flight the
+    verification moves to a thread pool. PyNaCl releases the GIL while verifying, so
+    this spreads the work over the other cores instead of stalling the event loop.
+
+    Parameters
+    ----------
+    public_key: str
+        The application's public key, hex encoded.
+    offload_threshold: int
+        In-flight requests from which verification runs in `executor`. 0 never offloads.
+        Defaults to 16.
+    executor: Optional[concurrent.futures.Executor]
+        The pool to verify in. Defaults to the event loop's default executor.
+    """
+
+    def __init__(
+        self,
+        public_key: str,
+        offload_threshold: int = 16,
+        executor: None | Executor = None,
+    ):
+        self.offload_threshold: int = offload_threshold
+        self.executor: None | Executor = executor
+        self.__key: VerifyKey = VerifyKey(bytes.fromhex(public_key))
+
+        self.verified: int = 0
+        self.rejected: int = 0
+        self.offloaded: int = 0
+        self.total_time: float = 0.0
+        self.max_time: float = 0.0
+
+    @property
+    def stats(self) -> dict:
+        """Verification counts and time spent verifying, excluding thread hand-off."""
+        checked = self.verified + self.rejected
+        return {
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "offloaded": self.offloaded,
+            "average_time": self.total_time / checked if checked else 0.0,
+            "max_time": self.max_time,
+        }
+
+    def check(self, signature: str, timestamp: str, body: bytes) -> tuple[bool, float]:
+        """Verifies a request, returning the outcome and the time it took."""
+        started = time.perf_counter()
+        try:
+            self.__key.verify(
+                b"".join((bytes.fromhex(signature), timestamp.encode(), body))
+            )
+            valid = True
+        except (BadSignatureError, ValueError):
+            valid = False
+        return valid, time.perf_counter() - started
+
+    async def verify(
+        self, signature: str, timestamp: str, body: bytes, inflight: int = 0
+    ) -> bool:
+        """
+        Verifies a request, in the executor if `inflight` reached the offload threshold
+
+        Parameters
+        ----------
+        signature: str
+            The X-Signature-Ed25519 header.
+        timestamp: str
+            The X-Signature-Timestamp header.
+        body: bytes
+            The raw request body.
+        inflight: int
+            Number of requests currently being handled.
+        """
+        if self.offload_threshold and inflight >= self.offload_threshold:
+            self.offloaded += 1
+            valid, elapsed = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.check, signature, timestamp, body
+            )
+        else:
+            valid, elapsed = self.check(signature, timestamp, body)
+
+        if valid:
+            self.verified += 1
+        else:
+            self.rejected += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        return valid